@@ -0,0 +1,193 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+from collections import deque
+from typing import Callable, Dict, Optional
+import socketserver
+import threading
+import logging
+import json
+import time
+import os
+from models import CourseResult
+from utils import sanitize_course_code
+
+class SnapshotStore:
+    """
+    Latest result per course, kept in memory for the local API.
+    Every change bumps a version number so clients can long-poll for updates.
+    """
+
+    def __init__(self, history: int = 1000):
+        self.results: Dict[str, CourseResult] = {}
+        self.version = 0
+        self.changes = deque(maxlen=history)  # (version, course code)
+        self.condition = threading.Condition()
+
+    def update(self, result: CourseResult) -> bool:
+        """Store a successful result. Returns True if seats or sections changed."""
+        if not result.ok:
+            return False
+
+        with self.condition:
+            previous = self.results.get(result.key)
+            self.results[result.key] = result
+            if previous is not None and (result.unchanged or self._fingerprint(previous) == self._fingerprint(result)):
+                return False
+
+            self.version += 1
+            self.changes.append((self.version, result.key))
+            self.condition.notify_all()
+            return True
+
+    def remove(self, course_code: str) -> bool:
+        """Drop a course that is no longer watched. Returns True if it had a snapshot."""
+        key = sanitize_course_code(course_code)
+        with self.condition:
+            if self.results.pop(key, None) is None:
+                return False
+            self.version += 1
+            self.changes.append((self.version, key))
+            self.condition.notify_all()
+            return True
+
+    def get(self, course_code: str) -> Optional[dict]:
+        """Return one course snapshot with sections and age, or None if never checked."""
+        with self.condition:
+            result = self.results.get(sanitize_course_code(course_code))
+        return self._snapshot(result, sections=True) if result else None
+
+    def all(self) -> dict:
+        """Return every course snapshot (without section details)."""
+        with self.condition:
+            results = list(self.results.values())
+            version = self.version
+        return {"version": version, "courses": [self._snapshot(r) for r in results]}
+
+    def changes_since(self, since: int, timeout: float) -> dict:
+        """
+        Wait up to timeout seconds for changes after version since, then return them.
+        Courses that stopped being watched since then are listed under "removed".
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version > since, timeout=timeout)
+            version = self.version
+            codes = []
+            for change_version, course_code in self.changes:
+                if change_version > since and course_code not in codes:
+                    codes.append(course_code)
+            results = [self.results[code] for code in codes if code in self.results]
+            removed = [code for code in codes if code not in self.results]
+        return {
+            "version": version,
+            "changes": [self._snapshot(r, sections=True) for r in results],
+            "removed": removed,
+        }
+
+    @staticmethod
+    def _fingerprint(result: CourseResult) -> tuple:
+        return result.seats, tuple((s.crn, s.seats, s.status) for s in result.sections)
+
+    @staticmethod
+    def _snapshot(result: CourseResult, sections: bool = False) -> dict:
+        snapshot = result.to_dict()
+        snapshot["age_sec"] = round(time.time() - result.checked_at, 1)
+        if sections:
+            snapshot["sections"] = [s.to_dict() for s in result.sections]
+        return snapshot
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """
+    Read-only endpoints served from the snapshot store (never triggers a scrape):
+    GET /courses, /courses/<code>, /changes?since=<version>&timeout=<sec>, /stats, /health
+    """
+    server_version = "CourseNotifierAPI/1.0"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        store = self.server.store
+
+        if parts == ["health"]:
+            self.send_json({"status": "ok"})
+        elif parts == ["courses"]:
+            self.send_json(store.all())
+        elif len(parts) == 2 and parts[0] == "courses":
+            snapshot = store.get(parts[1])
+            if snapshot is None:
+                self.send_json({"error": f"{parts[1]} has not been checked"}, status=404)
+            else:
+                self.send_json(snapshot)
+        elif parts == ["changes"]:
+            query = parse_qs(url.query)
+            try:
+                since = int(query.get("since", ["0"])[0])
+                timeout = min(float(query.get("timeout", ["30"])[0]), self.server.max_poll_sec)
+            except ValueError:
+                self.send_json({"error": "since and timeout must be numbers"}, status=400)
+                return
+            self.send_json(store.changes_since(since, timeout))
+        elif parts == ["stats"]:
+            self.send_json(self.server.stats_provider())
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug("API %s - " + format, self.address_string(), *args)
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class AvailabilityAPI:
+    """Serves the snapshot store over HTTP on a TCP port or a Unix socket, in a background thread."""
+
+    def __init__(self, store: SnapshotStore, stats_provider: Callable[[], dict],
+                 host: str = "127.0.0.1", port: int = 0, socket_path: Optional[str] = None,
+                 max_poll_sec: float = 60):
+        self.store = store
+        self.stats_provider = stats_provider
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.max_poll_sec = max_poll_sec
+        self.server = None
+        self.thread = None
+
+    def start(self) -> None:
+        """Bind the server and start serving in a daemon thread."""
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.server = ThreadingUnixHTTPServer(self.socket_path, APIRequestHandler)
+            address = self.socket_path
+        else:
+            self.server = ThreadingHTTPServer((self.host, self.port), APIRequestHandler)
+            address = f"http://{self.host}:{self.server.server_address[1]}"
+
+        self.server.store = self.store
+        self.server.stats_provider = self.stats_provider
+        self.server.max_poll_sec = self.max_poll_sec
+
+        self.thread = threading.Thread(target=self.server.serve_forever, name="availability-api", daemon=True)
+        self.thread.start()
+        logging.info(f"Availability API listening on {address}")
+
+    def stop(self) -> None:
+        """Stop serving and remove the Unix socket if one was used."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
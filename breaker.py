@@ -0,0 +1,106 @@
+from typing import Callable
+import threading
+import logging
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of running a stage while its circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open, next probe in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    Circuit breaker with exponential backoff and half-open probing.
+    After failure_threshold consecutive failures the circuit opens; once the backoff
+    expires a single probe is let through. A failed probe re-opens the circuit with
+    double the backoff (up to max_backoff), a successful one closes it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 2, backoff: float = 60,
+                 max_backoff: float = 1800, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.current_backoff = backoff
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.opened_count = 0
+        self.rejected_count = 0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead now."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and self.clock() >= self.open_until:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                logging.info(f"{self.name} circuit half-open, sending probe")
+
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+
+            self.rejected_count += 1
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 if closed)."""
+        with self.lock:
+            if self.state == CLOSED:
+                return 0.0
+            return max(0.0, self.open_until - self.clock())
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the backoff."""
+        with self.lock:
+            if self.state != CLOSED:
+                logging.info(f"{self.name} circuit closed after successful probe")
+            self.state = CLOSED
+            self.failures = 0
+            self.current_backoff = self.base_backoff
+            self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening (or re-opening) the circuit when needed."""
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                # Failed probe: back off further
+                self.current_backoff = min(self.current_backoff * 2, self.max_backoff)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.current_backoff = self.base_backoff
+                self._open()
+
+    def stats(self) -> dict:
+        """Return the breaker state and counters."""
+        with self.lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "backoff_sec": self.current_backoff,
+                "opened": self.opened_count,
+                "rejected": self.rejected_count,
+            }
+
+    def _open(self) -> None:
+        """Open the circuit for the current backoff (caller holds the lock)."""
+        self.state = OPEN
+        self.probe_in_flight = False
+        self.open_until = self.clock() + self.current_backoff
+        self.opened_count += 1
+        logging.warning(f"{self.name} circuit open after {self.failures} failures, retrying in {self.current_backoff:.0f}s")
@@ -0,0 +1,219 @@
+from typing import Callable, Dict, Optional
+import threading
+import logging
+import time
+from models import CourseResult
+from utils import RateLimiter, sanitize_course_code
+
+class BurstMonitor:
+    """
+    Polls courses that just opened, or look about to change (few seats left, or a full
+    course whose section statuses moved, e.g. its waitlist), every few seconds for a
+    bounded window on a dedicated browser session. Sends follow-up notifications when
+    a course closes or reopens. Every poll takes a token from the shared scrape budget,
+    so bursts only use capacity the regular cycle leaves over.
+    forget(course_code) is called when a course closes, to drop the regular check's
+    fingerprint so its next opening is evaluated (and announced) again.
+    """
+
+    def __init__(self, session_factory: Callable, engine_name: str, notifier, snapshots,
+                 budget: RateLimiter, window: float = 600, near_seats: int = 1,
+                 forget: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.session_factory = session_factory
+        self.forget = forget
+        self.engine_name = engine_name
+        self.notifier = notifier
+        self.snapshots = snapshots
+        self.budget = budget
+        self.window = window
+        self.near_seats = near_seats
+        self.clock = clock
+        self.scraper = None  # Created on the first burst, then kept warm
+        self.engine = None
+        self.last_results: Dict[str, CourseResult] = {}
+        self.bursts: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self.started = 0
+        self.polls = 0
+        self.budget_skips = 0
+        self.follow_ups = 0
+
+    def is_active(self, course_code: str) -> bool:
+        """True if the course is currently being burst-polled."""
+        with self.lock:
+            return sanitize_course_code(course_code) in self.bursts
+
+    def observe(self, result: CourseResult) -> Optional[str]:
+        """
+        Look at a regular check result and start a burst if the course just opened or is
+        close to changing. Returns the reason a burst was started, or None.
+        """
+        if not result.ok:
+            return None
+
+        with self.lock:
+            previous = self.last_results.get(result.key)
+            self.last_results[result.key] = result
+            if previous is None or result.key in self.bursts:
+                return None
+
+            reason = None
+            if result.seats > 0 and previous.seats == 0:
+                reason = "just opened"
+            elif 0 < result.seats <= self.near_seats and result.seats < previous.seats:
+                reason = f"down to {result.seats} seats"
+            elif (result.seats == 0 and not result.unchanged
+                  and [s.status for s in result.sections] != [s.status for s in previous.sections]):
+                reason = "section status changed while full"
+
+            if reason is None:
+                return None
+
+            now = self.clock()
+            burst = {
+                "until": now + self.window,
+                "seats": result.seats,
+                "opened_at": now if result.seats > 0 else None,
+                "open_sec": 0.0,
+                "reopened": 0,
+                "polls": 0,
+            }
+            if reason == "just opened":
+                # Start closed so the first poll confirms (and if needed announces) the opening
+                burst.update(seats=0, opened_at=None, pending_open_at=now)
+            self.bursts[result.key] = burst
+            self.started += 1
+
+        logging.info(f"Burst mode for {result.key} ({reason}) for the next {self.window:.0f}s")
+        return reason
+
+    def poll(self) -> None:
+        """Check every course in burst mode once (scheduled every BURST_INTERVAL_SEC)."""
+        with self.lock:
+            keys = list(self.bursts)
+        if not keys:
+            return
+
+        for key in keys:
+            if self.clock() >= self.bursts[key]["until"]:
+                self.end_burst(key)
+                continue
+
+            # Regular cycles keep priority: skip this round if the budget is used up
+            if not self.budget.try_acquire():
+                self.budget_skips += 1
+                logging.debug("Scrape budget used up, delaying burst polls")
+                return
+
+            if not self.ensure_session():
+                return
+
+            result = self.engine(key)
+            self.polls += 1
+            self.bursts[key]["polls"] += 1
+            if not result.ok:
+                logging.warning(f"Burst poll for {key} failed: {result.error}")
+                continue
+
+            self.snapshots.update(result)
+            with self.lock:
+                self.last_results[key] = result
+            self.handle_transition(key, result)
+
+    def handle_transition(self, key: str, result: CourseResult) -> None:
+        """Send a follow-up notification if the course closed or reopened since the last poll."""
+        burst = self.bursts[key]
+        now = self.clock()
+        was_open = burst["seats"] > 0
+        burst["seats"] = result.seats
+
+        pending_open_at = burst.pop("pending_open_at", None)
+        if pending_open_at is not None:
+            # First poll after the regular check saw the opening
+            burst["opened_at"] = pending_open_at
+            if result.available:
+                # Confirmed, whatever the seat count now; only announce it if the
+                # regular check's notification didn't go out
+                logging.info(f"{key} still open with {result.seats} seats")
+                if not self.notifier.has_notified(key):
+                    self.notifier.notify(key, result.seats)
+                return
+            was_open = True  # Already gone again
+
+        if not was_open and result.available:
+            if burst["opened_at"] is None:
+                # Opened during a burst started while full: the regular check hasn't seen it
+                burst["opened_at"] = now
+                logging.info(f"{key} open with {result.seats} seats")
+                self.notifier.notify(key, result.seats)
+                return
+            burst["reopened"] += 1
+            burst["opened_at"] = now
+            message = f"{key} open again! {result.seats} seats"
+        elif was_open and not result.available:
+            lasted = now - burst["opened_at"]
+            burst["open_sec"] += lasted
+            message = f"{key} is full again (seats lasted {lasted:.0f}s)"
+            # Let the next opening through the regular check's dedup and fingerprint
+            self.notifier.clear_notification_cache(key)
+            if self.forget:
+                self.forget(key)
+        else:
+            return
+
+        logging.info(message)
+        if self.notifier.notify(key, result.seats, message=message):
+            self.follow_ups += 1
+
+    def end_burst(self, key: str) -> None:
+        """Stop polling a course and log how long it stayed open."""
+        with self.lock:
+            burst = self.bursts.pop(key, None)
+        if burst is None:
+            return
+
+        open_sec = burst["open_sec"]
+        if burst["seats"] > 0:
+            open_sec += self.clock() - burst["opened_at"]
+        logging.info(f"Burst mode for {key} ended after {burst['polls']} polls: open {open_sec:.0f}s of "
+                     f"{self.window:.0f}s, reopened {burst['reopened']} times, {burst['seats']} seats now")
+
+    def ensure_session(self) -> bool:
+        """Start the dedicated browser session on first use. Returns False if it can't be started."""
+        if self.engine is not None:
+            return True
+        try:
+            self.scraper = self.session_factory()
+            if not self.scraper.start_session():
+                logging.warning("Burst session login may have failed, but continuing...")
+            self.engine = self.scraper.get_engine(self.engine_name)
+            logging.info("Burst browser session ready")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to start burst browser session, ending bursts: {e}")
+            with self.lock:
+                self.bursts.clear()
+            self.close()
+            return False
+
+    def stats(self) -> dict:
+        """Return active bursts and counters."""
+        now = self.clock()
+        with self.lock:
+            active = {key: {"seats": b["seats"], "polls": b["polls"], "remaining_sec": round(b["until"] - now)}
+                      for key, b in self.bursts.items()}
+        return {
+            "active": active,
+            "started": self.started,
+            "polls": self.polls,
+            "budget_skips": self.budget_skips,
+            "follow_ups": self.follow_ups,
+        }
+
+    def close(self) -> None:
+        """Close the dedicated browser session."""
+        if self.scraper:
+            self.scraper.close()
+        self.scraper = None
+        self.engine = None
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+import threading
+import logging
+import time
+from models import CourseResult
+from utils import sanitize_course_code
+
+class ResultCache:
+    """
+    TTL + LRU cache in front of a course check function.
+    Concurrent requests for the same course share a single in-flight check.
+    """
+
+    def __init__(self, fetch: Callable[[str], CourseResult], ttl: float = 60,
+                 max_size: int = 256, ttl_overrides: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_size = max_size
+        self.ttl_overrides = {sanitize_course_code(k): v for k, v in (ttl_overrides or {}).items()}
+        self.clock = clock
+        self.entries = OrderedDict()  # course code -> (expires_at, result)
+        self.in_flight = {}  # course code -> Future
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl_for(self, course_code: str) -> float:
+        """Return the TTL in seconds for a course."""
+        return self.ttl_overrides.get(course_code, self.ttl)
+
+    def peek(self, course_code: str) -> Optional[CourseResult]:
+        """Return the cached result if it is still fresh, without checking or counting."""
+        key = sanitize_course_code(course_code)
+        with self.lock:
+            return self._fresh(key)
+
+    def get(self, course_code: str) -> CourseResult:
+        """Return a fresh cached result, or check the course (once, even if asked concurrently)."""
+        key = sanitize_course_code(course_code)
+
+        with self.lock:
+            cached = self._fresh(key)
+            if cached is not None:
+                self.hits += 1
+                logging.debug("Cache hit for %s", key)
+                return cached
+
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = Future()
+                self.in_flight[key] = future
+                owner = True
+
+        if not owner:
+            logging.debug("Waiting on in-flight check for %s", key)
+            return future.result()
+
+        try:
+            result = self.fetch(key)
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.in_flight[key]
+            self._store(key, result)
+        future.set_result(result)
+        return result
+
+    def put(self, result: CourseResult) -> None:
+        """Store a result obtained outside get(), e.g. from a batch check."""
+        with self.lock:
+            self._store(result.key, result)
+
+    def invalidate(self, course_code: Optional[str] = None) -> None:
+        """Drop one course, or everything, from the cache."""
+        with self.lock:
+            if course_code is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(sanitize_course_code(course_code), None)
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+    def _fresh(self, key: str) -> Optional[CourseResult]:
+        """Return the entry for key if not expired (caller holds the lock)."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if self.clock() >= expires_at:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return result
+
+    def _store(self, key: str, result: CourseResult) -> None:
+        """Insert a result and evict least recently used entries (caller holds the lock)."""
+        ttl = self.ttl_for(key)
+        # Failed checks are not cached so the next request retries
+        if ttl <= 0 or not result.ok:
+            return
+        self.entries[key] = (self.clock() + ttl, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            evicted, _ = self.entries.popitem(last=False)
+            logging.debug("Evicted %s from result cache", evicted)
+
+class FingerprintStore:
+    """
+    Last rows fingerprint and result per watched course, for skipping unchanged checks.
+    Each engine keeps its own store so a shadow check never overwrites the primary's.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, tuple] = {}  # course key -> (digest, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, key: str, digest: bytes) -> Optional[CourseResult]:
+        """Return the stored result if its fingerprint equals digest (counted as a hit)."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == digest:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def record(self, key: str, digest: bytes, result: CourseResult) -> None:
+        """Store the fingerprint and parsed result of a check."""
+        with self.lock:
+            self.entries[key] = (digest, result)
+
+    def forget(self, course_code: Optional[str] = None) -> None:
+        """Drop one course's fingerprint, or all of them, so the next check is fully evaluated."""
+        with self.lock:
+            if course_code is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(sanitize_course_code(course_code), None)
+
+    def stats(self) -> dict:
+        """Return unchanged-results (hit) and changed-results (miss) counters."""
+        with self.lock:
+            return {
+                "courses": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
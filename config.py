@@ -1,9 +1,26 @@
 import os
 import logging
-from dotenv import load_dotenv
+from dotenv import load_dotenv, dotenv_values, find_dotenv
 
-# Load environment variables
-load_dotenv()
+# Process environment before the .env file is applied (watched-file reloads layer over this)
+BASE_ENVIRON = dict(os.environ)
+
+# Load environment variables (the same file is watched for hot reload by default)
+DOTENV_FILE = find_dotenv()
+load_dotenv(DOTENV_FILE)
+
+def parse_mapping(value: str, cast=str) -> dict:
+    """Parse "KEY=VALUE,KEY=VALUE" strings (used for per-course settings)."""
+    mapping = {}
+    for item in (value or "").split(","):
+        key, _, raw = item.partition("=")
+        if key.strip() and raw.strip():
+            mapping[key.strip()] = cast(raw.strip())
+    return mapping
+
+def parse_course_codes(value: str) -> list:
+    """Parse the comma-separated COURSE_CODES value."""
+    return [c.strip() for c in (value or "").split(",") if c.strip()]
 
 # Twilio Configuration
 TWILIO_SID = os.getenv("TWILIO_SID")
@@ -11,26 +28,137 @@ TWILIO_TOKEN = os.getenv("TWILIO_TOKEN")
 TWILIO_FROM = os.getenv("TWILIO_FROM")
 TWILIO_TO = os.getenv("TWILIO_TO")
 
+# Notification Configuration
+# JSON list of subscribers with per-subscriber channels; defaults to SMS to TWILIO_TO
+SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE")
+# Per-backend limits in messages per minute and timeouts in seconds, e.g. "sms=10,webhook=120"
+NOTIFY_RATE_LIMITS = parse_mapping(os.getenv("NOTIFY_RATE_LIMITS"), float)
+NOTIFY_TIMEOUTS = parse_mapping(os.getenv("NOTIFY_TIMEOUTS"), float)
+NOTIFY_TIMEOUT_SEC = float(os.getenv("NOTIFY_TIMEOUT_SEC", "15"))
+
+# SMTP Configuration (email backend)
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_FROM = os.getenv("SMTP_FROM")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+
 # Course Configuration
-COURSE_CODES = [c.strip() for c in os.getenv("COURSE_CODES").split(",") if c.strip()]
+COURSE_CODES = parse_course_codes(os.getenv("COURSE_CODES"))
 INTERVAL_MIN = int(os.getenv("INTERVAL_MIN"))
 
+# Result Cache Configuration
+RESULT_CACHE_TTL_SEC = float(os.getenv("RESULT_CACHE_TTL_SEC", "60"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+# Per-course TTL overrides, e.g. "CSCI2020U=30,MATH1010U=120"
+RESULT_CACHE_TTL_OVERRIDES = parse_mapping(os.getenv("RESULT_CACHE_TTL_OVERRIDES"), float)
+
+# Cycle Configuration
+# Time budget for one check_all_courses run (defaults to the check interval)
+CYCLE_DEADLINE_SEC = float(os.getenv("CYCLE_DEADLINE_SEC") or INTERVAL_MIN * 60)
+# What to do when a cycle runs past its deadline: skip, carry or shed
+OVERRUN_POLICY = os.getenv("OVERRUN_POLICY", "carry").lower()
+# Higher numbers are checked first and shed last, e.g. "CSCI2020U=10,MATH1010U=1"
+COURSE_PRIORITIES = parse_mapping(os.getenv("COURSE_PRIORITIES"), int)
+
+# Term Configuration
+# Courses are watched in DEFAULT_TERM unless prefixed with a term, e.g. "FALL2025:CSCI2000U"
+DEFAULT_TERM = os.getenv("DEFAULT_TERM", os.getenv("FETCH_TERM", "winter"))
+# Optional Banner term codes (skips the term lookup), e.g. "FALL2025=202509,WINTER2026=202601"
+TERM_CODES = {k.upper().replace(" ", ""): v for k, v in parse_mapping(os.getenv("TERM_CODES")).items()}
+# Unprefixed courses are watched under the "" term (FETCH_TERM_CODE is the older setting)
+TERM_CODES[""] = os.getenv("FETCH_TERM_CODE") or TERM_CODES.get(DEFAULT_TERM.upper().replace(" ", ""))
+
 # Site Configuration
 BASE_URL = os.getenv("BASE_URL")
 SITE_USERNAME = os.getenv("SITE_USERNAME")  
 SITE_PASSWORD = os.getenv("SITE_PASSWORD")
 
+# Circuit Breaker Configuration (per stage: login, term selection, search)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "2"))
+BREAKER_BACKOFF_SEC = float(os.getenv("BREAKER_BACKOFF_SEC", "60"))
+BREAKER_MAX_BACKOFF_SEC = float(os.getenv("BREAKER_MAX_BACKOFF_SEC", "1800"))
+
+# Scraping Engine Configuration
+# "browser" drives the class search UI; "fetch" calls Banner's search endpoint from inside the logged-in page
+SCRAPE_ENGINE = os.getenv("SCRAPE_ENGINE", "browser").lower()
+FETCH_BATCH_SIZE = int(os.getenv("FETCH_BATCH_SIZE", "20"))
+FETCH_PAGE_SIZE = int(os.getenv("FETCH_PAGE_SIZE", "500"))
+# Upper bound on result pages read per search (both engines page through all results)
+RESULTS_MAX_PAGES = int(os.getenv("RESULTS_MAX_PAGES", "50"))
+FETCH_DELAY_MS = int(os.getenv("FETCH_DELAY_MS", "250"))  # Pause between requests within a batch
+FETCH_TIMEOUT_SEC = float(os.getenv("FETCH_TIMEOUT_SEC", "60"))
+
+# Global budget for course checks per minute, shared by regular cycles and burst polls
+SCRAPE_RATE_PER_MIN = float(os.getenv("SCRAPE_RATE_PER_MIN", "12"))
+
+# Burst Mode Configuration
+# Courses that just opened (or are about to) are polled every BURST_INTERVAL_SEC on a
+# second browser session for BURST_WINDOW_SEC (0 disables burst mode)
+BURST_WINDOW_SEC = float(os.getenv("BURST_WINDOW_SEC", "600"))
+BURST_INTERVAL_SEC = float(os.getenv("BURST_INTERVAL_SEC", "15"))
+BURST_NEAR_SEATS = int(os.getenv("BURST_NEAR_SEATS", "1"))  # This many seats or fewer counts as about to close
+
+# Shadow Verification Configuration
+# Alternative engine run beside the primary on a sample of checks ("browser", "script", "source"
+# or "fetch"); empty disables
+SHADOW_ENGINE = os.getenv("SHADOW_ENGINE", "").lower()
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+
+# Local API Configuration (serves the latest snapshots; disabled unless a port or socket is set)
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT") or 0)
+API_SOCKET = os.getenv("API_SOCKET")
+
 # Browser Configuration
 CHROME_PROFILE_PATH = os.getenv("CHROME_PROFILE_PATH")
 HEADLESS = os.getenv("HEADLESS").lower() == "true"
+# Saved cookies let restarts skip the SSO login (empty disables)
+SESSION_FILE = os.getenv("SESSION_FILE", ".session_cookies.json")
+SESSION_MAX_AGE_SEC = float(os.getenv("SESSION_MAX_AGE_SEC", str(12 * 60 * 60)))
+# "script" extracts results with one in-browser script; "source" parses the full page source
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "script").lower()
+
+# Hot Reload Configuration
+# File watched for COURSE_CODES / INTERVAL_MIN / CYCLE_DEADLINE_SEC / COURSE_PRIORITIES changes
+CONFIG_WATCH_FILE = os.getenv("CONFIG_WATCH_FILE") or DOTENV_FILE
+CONFIG_WATCH_SEC = float(os.getenv("CONFIG_WATCH_SEC", "10"))  # 0 disables watching
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL")
 LOG_FILE = os.getenv("LOG_FILE")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # text or json
+LOG_ASYNC = os.getenv("LOG_ASYNC", "false").lower() == "true"
+# At DEBUG, log only every Nth results row
+LOG_ROW_SAMPLE_EVERY = max(1, int(os.getenv("LOG_ROW_SAMPLE_EVERY", "10")))
+
+def load_watch_settings(path: str) -> dict:
+    """
+    Re-read the settings that can change while running from an env file.
+    Values in the file win; anything missing falls back to the settings loaded at startup,
+    without the file's own earlier values, so removing a key from the file takes effect.
+    """
+    values = dict(BASE_ENVIRON)
+    if DOTENV_FILE and os.path.abspath(path) != os.path.abspath(DOTENV_FILE):
+        # A separate watch file: keep what .env set at startup (the process environment wins there)
+        values = {k: v for k, v in dotenv_values(DOTENV_FILE).items() if v is not None}
+        values.update(BASE_ENVIRON)
+    values.update({k: v for k, v in dotenv_values(path).items() if v is not None})
+    
+    interval_min = int(values.get("INTERVAL_MIN") or INTERVAL_MIN)
+    return {
+        "course_codes": parse_course_codes(values.get("COURSE_CODES")),
+        "interval_min": interval_min,
+        "cycle_deadline_sec": float(values.get("CYCLE_DEADLINE_SEC") or interval_min * 60),
+        "course_priorities": parse_mapping(values.get("COURSE_PRIORITIES"), int),
+    }
 
 def validate_config() -> bool:
     """Validate that all required configuration is present."""
-    required_vars = {
+    # With a subscribers file, Twilio is only needed if a subscriber uses SMS
+    # (checked when the backends are set up)
+    required_vars = {} if SUBSCRIBERS_FILE else {
         "TWILIO_SID": TWILIO_SID,
         "TWILIO_TOKEN": TWILIO_TOKEN,
         "TWILIO_FROM": TWILIO_FROM,
@@ -47,4 +175,12 @@ def validate_config() -> bool:
         logging.error("No course codes specified in COURSE_CODES")
         return False
     
+    if SCRAPE_ENGINE not in ("browser", "fetch"):
+        logging.error(f"Invalid SCRAPE_ENGINE '{SCRAPE_ENGINE}' (expected browser or fetch)")
+        return False
+    
+    if OVERRUN_POLICY not in ("skip", "carry", "shed"):
+        logging.error(f"Invalid OVERRUN_POLICY '{OVERRUN_POLICY}' (expected skip, carry or shed)")
+        return False
+    
     return True 
\ No newline at end of file
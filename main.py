@@ -1,26 +1,153 @@
 import sys
-from config import validate_config, LOG_LEVEL, LOG_FILE
-from utils import setup_logging
-from scheduler import CourseMonitor
+import json
+import time
+import argparse
+from config import validate_config, LOG_LEVEL, LOG_FILE, LOG_FORMAT, LOG_ASYNC
+from utils import setup_logging, read_course_codes
 import logging
 
-def main():
-    """Main entry point."""
-    # Setup logging
-    setup_logging(LOG_LEVEL, LOG_FILE)
-    
+# Exit statuses for the one-shot "check" command (grep-style)
+EXIT_AVAILABLE = 0
+EXIT_NONE_AVAILABLE = 1
+EXIT_ERROR = 2
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="course-notifier",
+        description="Monitor university course availability and send SMS notifications"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("run", help="Start the scheduled monitor (default)")
+
+    check_parser = subparsers.add_parser(
+        "check",
+        help="Check courses once and stream one JSON line per result to stdout"
+    )
+    check_parser.add_argument(
+        "courses", nargs="*",
+        help="Course codes to check; use '-' to read codes from stdin"
+    )
+    check_parser.add_argument(
+        "-f", "--file",
+        help="Read course codes from a file ('-' for stdin), one or more per line"
+    )
+    check_parser.add_argument(
+        "--sections", action="store_true",
+        help="Also emit one line per matching section before each course line"
+    )
+    check_parser.add_argument(
+        "--delay", type=float, default=2.0,
+        help="Seconds to wait between course checks (default: 2)"
+    )
+    return parser
+
+def collect_course_codes(args) -> list:
+    """Gather course codes from arguments, --file and/or stdin."""
+    lines = [code for code in args.courses if code != "-"]
+    read_stdin = "-" in args.courses or args.file == "-"
+
+    if args.file and args.file != "-":
+        with open(args.file) as f:
+            lines.extend(f.readlines())
+
+    # Fall back to piped stdin when nothing else was given
+    if not lines and not args.file and not sys.stdin.isatty():
+        read_stdin = True
+
+    if read_stdin:
+        lines.extend(sys.stdin.readlines())
+
+    return read_course_codes(lines)
+
+def emit(record: dict) -> None:
+    """Write one JSON line to stdout and flush so consumers see it immediately."""
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+def run_check(args) -> int:
+    """One-shot batch check of the given courses in a single logged-in session."""
+    try:
+        course_codes = collect_course_codes(args)
+    except OSError as e:
+        logging.error(f"Could not read course codes: {e}")
+        return EXIT_ERROR
+
+    if not course_codes:
+        logging.error("No course codes given (pass them as arguments, --file or stdin)")
+        return EXIT_ERROR
+
+    from scraper import CourseScraper
+
+    try:
+        scraper = CourseScraper()
+    except Exception as e:
+        logging.error(f"Fatal error: {e}")
+        return EXIT_ERROR
+
+    found_available = False
+    had_errors = False
+    try:
+        if not scraper.start_session():
+            logging.warning("Login may have failed, but continuing...")
+
+        for index, course_code in enumerate(course_codes):
+            result = scraper.check_course_result(course_code)
+
+            if args.sections:
+                for section in result.sections:
+                    emit({"type": "section", "course": result.course_code, "term": result.term, **section.to_dict()})
+            emit({"type": "course", **result.to_dict()})
+
+            if result.available:
+                found_available = True
+            elif not result.ok:
+                had_errors = True
+
+            # Small delay between course checks to be respectful
+            if index < len(course_codes) - 1 and args.delay > 0:
+                time.sleep(args.delay)
+    except KeyboardInterrupt:
+        logging.info("Received keyboard interrupt")
+        return EXIT_ERROR
+    finally:
+        scraper.close()
+
+    if found_available:
+        return EXIT_AVAILABLE
+    return EXIT_ERROR if had_errors else EXIT_NONE_AVAILABLE
+
+def run_monitor() -> int:
+    """Validate configuration and start the scheduled monitor."""
+    from scheduler import CourseMonitor
+
     # Validate configuration
     if not validate_config():
         logging.error("Configuration validation failed. Please check your .env file.")
-        sys.exit(1)
-    
+        return 1
+
     # Create and start monitor
     try:
         monitor = CourseMonitor()
         monitor.start()
     except Exception as e:
         logging.error(f"Fatal error: {e}")
-        sys.exit(1)
+        return 1
+    return 0
+
+def main(argv=None):
+    """Main entry point."""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "check":
+        # Keep stdout clean for JSON output
+        setup_logging(LOG_LEVEL, LOG_FILE, stream=sys.stderr, log_format=LOG_FORMAT, use_queue=LOG_ASYNC)
+        sys.exit(run_check(args))
+
+    # Setup logging
+    setup_logging(LOG_LEVEL, LOG_FILE, log_format=LOG_FORMAT, use_queue=LOG_ASYNC)
+    sys.exit(run_monitor())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+import time
+from utils import watch_key
+
+@dataclass
+class SectionResult:
+    """A single matching section row from the class search results."""
+    subject: str
+    course_number: str
+    schedule_type: str
+    status: str
+    seats: int = 0
+    crn: str = ""
+    section: str = ""
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable representation of the section."""
+        return {
+            "subject": self.subject,
+            "course_number": self.course_number,
+            "schedule_type": self.schedule_type,
+            "crn": self.crn,
+            "section": self.section,
+            "status": self.status,
+            "seats": self.seats,
+        }
+
+@dataclass
+class CourseResult:
+    """
+    Outcome of checking one course code in one term ("" is the default term).
+    error is set when the check itself failed; unchanged is set when the results
+    matched the previous check exactly (seats and sections are carried over).
+    """
+    course_code: str
+    term: str = ""
+    seats: int = 0
+    sections: List[SectionResult] = field(default_factory=list)
+    checked_at: float = field(default_factory=time.time)
+    error: Optional[str] = None
+    unchanged: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True if the check completed (seats reflects the site, not a failure)."""
+        return self.error is None
+
+    @property
+    def key(self) -> str:
+        """The watched course key: "TERM:CODE", or just the code for the default term."""
+        return watch_key(self.term, self.course_code)
+
+    @property
+    def available(self) -> bool:
+        """True if at least one matching section has open seats."""
+        return self.seats > 0
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable summary of the course check."""
+        return {
+            "course": self.course_code,
+            "term": self.term,
+            "seats": self.seats,
+            "available": self.available,
+            "sections": len(self.sections),
+            "checked_at": datetime.fromtimestamp(self.checked_at).isoformat(timespec="seconds"),
+            "error": self.error,
+        }
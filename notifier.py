@@ -1,62 +1,288 @@
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioException
+from concurrent.futures import ThreadPoolExecutor, wait
+from email.message import EmailMessage
 from datetime import datetime
+from typing import Dict, List, Optional
+import urllib.request
+import subprocess
+import threading
+import smtplib
 import logging
-from config import TWILIO_SID, TWILIO_TOKEN, TWILIO_FROM, TWILIO_TO
+import shlex
+import json
+import os
+from config import (
+    TWILIO_SID, TWILIO_TOKEN, TWILIO_FROM, TWILIO_TO,
+    SUBSCRIBERS_FILE, NOTIFY_RATE_LIMITS, NOTIFY_TIMEOUTS, NOTIFY_TIMEOUT_SEC,
+    SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_FROM, SMTP_STARTTLS,
+)
+from utils import RateLimiter, sanitize_course_code, split_watch_key
+
+class NotificationBackend:
+    """
+    Base class for notification channels.
+    Subclasses implement deliver(); send() wraps it with the backend's rate limit.
+    """
+    name = "base"
+
+    def __init__(self, rate_per_min: Optional[float] = None, timeout: float = 10):
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_per_min) if rate_per_min else None
+
+    def send(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        """Deliver a message, waiting up to the backend timeout for rate-limit capacity."""
+        if self.rate_limiter and not self.rate_limiter.acquire(self.timeout):
+            raise RuntimeError(f"{self.name} rate limit reached")
+        return self.deliver(recipient, message, course_code, spots)
+
+    def deliver(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        """Send the message to one recipient. Returns a short delivery reference; raises on failure."""
+        raise NotImplementedError
+
+class SmsBackend(NotificationBackend):
+    """SMS via the Twilio REST API."""
+    name = "sms"
+
+    def __init__(self, rate_per_min: Optional[float] = None, timeout: float = 10):
+        super().__init__(rate_per_min, timeout)
+        from twilio.rest import Client
+        from twilio.http.http_client import TwilioHttpClient
+
+        try:
+            self.client = Client(TWILIO_SID, TWILIO_TOKEN, http_client=TwilioHttpClient(timeout=timeout))
+            logging.info("Twilio client initialized successfully")
+        except Exception as e:
+            logging.error(f"Failed to initialize Twilio client: {e}")
+            raise
+
+    def deliver(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        sms = self.client.messages.create(
+            from_=TWILIO_FROM,
+            to=recipient,
+            body=message
+        )
+        return f"SID: {sms.sid}"
+
+class WebhookBackend(NotificationBackend):
+    """JSON POST to an HTTP(S) URL."""
+    name = "webhook"
+
+    def deliver(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        payload = json.dumps({
+            "course": course_code,
+            "seats": spots,
+            "message": message,
+            "sent_at": datetime.now().isoformat(timespec="seconds"),
+        }).encode()
+        request = urllib.request.Request(
+            recipient,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return f"HTTP {response.status}"
+
+class EmailBackend(NotificationBackend):
+    """Plain-text email over SMTP."""
+    name = "email"
+
+    def deliver(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        email = EmailMessage()
+        email["Subject"] = message
+        email["From"] = SMTP_FROM or SMTP_USERNAME
+        email["To"] = recipient
+        email.set_content(message)
+
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=self.timeout) as smtp:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USERNAME and SMTP_PASSWORD:
+                smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+            smtp.send_message(email)
+        return "sent"
+
+class CommandBackend(NotificationBackend):
+    """Run a local command; the message is passed on stdin and in environment variables."""
+    name = "command"
+
+    def deliver(self, recipient: str, message: str, course_code: str, spots: int) -> str:
+        env = dict(os.environ,
+                   COURSE_CODE=course_code,
+                   COURSE_SEATS=str(spots),
+                   COURSE_MESSAGE=message)
+        completed = subprocess.run(
+            shlex.split(recipient),
+            input=message,
+            text=True,
+            env=env,
+            capture_output=True,
+            timeout=self.timeout
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"command exited with {completed.returncode}: {completed.stderr.strip()}")
+        return "exit 0"
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (SmsBackend, WebhookBackend, EmailBackend, CommandBackend)
+}
+
+def load_subscribers() -> List[dict]:
+    """
+    Load subscribers from SUBSCRIBERS_FILE, or fall back to a single SMS subscriber (TWILIO_TO).
+    Each subscriber has a name, a list of channels ({"backend": ..., "to": ...}) and an
+    optional list of courses it wants (empty means all; "CSCI2000U" matches every term,
+    "FALL2025:CSCI2000U" only that term).
+    """
+    if not SUBSCRIBERS_FILE:
+        return [{"name": "default", "channels": [{"backend": "sms", "to": TWILIO_TO}], "courses": []}]
+
+    with open(SUBSCRIBERS_FILE) as f:
+        subscribers = json.load(f)
+
+    for subscriber in subscribers:
+        subscriber.setdefault("name", "subscriber")
+        subscriber["courses"] = [sanitize_course_code(c) for c in subscriber.get("courses", [])]
+        for channel in subscriber.get("channels", []):
+            if channel.get("backend") not in BACKENDS:
+                raise ValueError(f"Unknown notification backend '{channel.get('backend')}' for {subscriber['name']}")
+    return subscribers
 
 class NotificationService:
     def __init__(self):
-        self.client = None
-        self.setup_twilio()
+        self.backends: Dict[str, NotificationBackend] = {}
+        self.subscribers = []
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+        self.setup_backends()
         self.sent_notifications = set()  # Track sent notifications to avoid spam
-    
-    def setup_twilio(self) -> None:
-        """Initialize Twilio client."""
+        self.lock = threading.Lock()  # Regular checks and burst polls notify from different threads
+
+    def setup_backends(self) -> None:
+        """Load subscribers and initialize only the backends they use."""
         try:
-            self.client = Client(TWILIO_SID, TWILIO_TOKEN)
-            logging.info("Twilio client initialized successfully")
+            self.subscribers = load_subscribers()
+            channel_counts = {}
+            for subscriber in self.subscribers:
+                for channel in subscriber.get("channels", []):
+                    channel_counts[channel["backend"]] = channel_counts.get(channel["backend"], 0) + 1
+            for name in sorted(channel_counts):
+                self.backends[name] = BACKENDS[name](
+                    rate_per_min=NOTIFY_RATE_LIMITS.get(name),
+                    timeout=NOTIFY_TIMEOUTS.get(name, NOTIFY_TIMEOUT_SEC)
+                )
+                # Workers per backend, so a slow provider (or one waiting on its rate
+                # limit) only ever queues its own deliveries
+                self.executors[name] = ThreadPoolExecutor(max_workers=channel_counts[name],
+                                                          thread_name_prefix=f"notify-{name}")
+            logging.info(f"Notification backends ready: {', '.join(sorted(self.backends)) or 'none'} "
+                         f"({len(self.subscribers)} subscribers)")
         except Exception as e:
-            logging.error(f"Failed to initialize Twilio client: {e}")
+            logging.error(f"Failed to initialize notification backends: {e}")
             raise
-    
-    def send_sms(self, course_code: str, spots: int) -> bool:
+
+    def describe_recipients(self) -> str:
+        """Short human-readable summary of who gets notified."""
+        return ", ".join(
+            f"{s['name']} ({'/'.join(c['backend'] for c in s.get('channels', []))})"
+            for s in self.subscribers
+        )
+
+    def notify(self, course_code: str, spots: int, message: Optional[str] = None) -> bool:
         """
-        Send SMS notification for course availability.
-        Returns True if successful, False otherwise.
+        Notify every subscriber of the course on all of their channels concurrently.
+        Returns True if at least one delivery succeeded (or this was a duplicate).
         """
-        try:
-            # Create notification key to avoid duplicate notifications
-            notification_key = f"{course_code}_{spots}"
-            
-            # Skip if we've already sent this exact notification recently
-            if notification_key in self.sent_notifications:
-                logging.info(f"Skipping duplicate notification for {course_code} with {spots} spots")
-                return True
-            
-            # Prepare SHORT message for trial account
-            message_body = f"{course_code} available now! {spots} seats"
-            
-            # Send SMS
-            message = self.client.messages.create(
-                from_=TWILIO_FROM,
-                to=TWILIO_TO,
-                body=message_body
+        # Create notification key to avoid duplicate notifications
+        notification_key = f"{course_code}_{spots}"
+
+        # Skip if we've already sent this exact notification recently
+        with self.lock:
+            duplicate = message is None and notification_key in self.sent_notifications
+        if duplicate:
+            logging.info(f"Skipping duplicate notification for {course_code} with {spots} spots")
+            return True
+
+        # Prepare SHORT message for trial account
+        message_body = message or f"{course_code} available now! {spots} seats"
+
+        clean_code = sanitize_course_code(course_code)
+        _, bare_code = split_watch_key(clean_code)
+        deliveries = {}
+        for subscriber in self.subscribers:
+            if subscriber["courses"] and clean_code not in subscriber["courses"] and bare_code not in subscriber["courses"]:
+                continue
+            for channel in subscriber.get("channels", []):
+                backend = self.backends[channel["backend"]]
+                future = self.executors[channel["backend"]].submit(backend.send, channel["to"], message_body, course_code, spots)
+                deliveries[future] = (subscriber["name"], backend)
+
+        if not deliveries:
+            logging.info(f"No subscribers for {course_code}")
+            return True
+
+        done, pending = wait(deliveries, timeout=NOTIFY_TIMEOUT_SEC)
+
+        delivered = 0
+        for future in done:
+            name, backend = deliveries[future]
+            try:
+                reference = future.result()
+                delivered += 1
+                logging.info(f"{backend.name} notification sent to {name} for {course_code} ({reference})")
+            except Exception as e:
+                logging.error(f"{backend.name} error notifying {name} for {course_code}: {e}")
+
+        for future in pending:
+            name, backend = deliveries[future]
+            logging.warning(f"{backend.name} notification to {name} for {course_code} still pending after {NOTIFY_TIMEOUT_SEC}s")
+            # Log the outcome whenever the slow delivery finishes
+            future.add_done_callback(
+                lambda f, name=name, backend=backend: logging.info(
+                    f"Late {backend.name} notification to {name} for {course_code}: "
+                    f"{'failed: ' + str(f.exception()) if f.exception() else f.result()}"
+                )
             )
-            
+
+        if delivered:
             # Track successful notification
-            self.sent_notifications.add(notification_key)
-            
-            logging.info(f"SMS sent successfully for {course_code} (SID: {message.sid})")
+            with self.lock:
+                self.sent_notifications.add(notification_key)
             return True
-            
-        except TwilioException as e:
-            logging.error(f"Twilio error sending SMS for {course_code}: {e}")
-            return False
-        except Exception as e:
-            logging.error(f"Unexpected error sending SMS for {course_code}: {e}")
-            return False
+        return False
+
+    def send_sms(self, course_code: str, spots: int) -> bool:
+        """Backwards-compatible alias for notify()."""
+        return self.notify(course_code, spots)
+
+    def clear_notification_cache(self, course_code: Optional[str] = None) -> None:
+        """
+        Clear the notification cache (useful for testing or long-running processes), or
+        only one course's entries so its next opening is announced again.
+        """
+        if course_code is None:
+            with self.lock:
+                self.sent_notifications.clear()
+            logging.info("Notification cache cleared")
+            return
+        
+        clean_code = sanitize_course_code(course_code)
+        with self.lock:
+            self.sent_notifications = {
+                key for key in self.sent_notifications
+                if sanitize_course_code(key.rpartition("_")[0]) != clean_code
+            }
     
-    def clear_notification_cache(self) -> None:
-        """Clear the notification cache (useful for testing or long-running processes)."""
-        self.sent_notifications.clear()
-        logging.info("Notification cache cleared") 
\ No newline at end of file
+    def has_notified(self, course_code: str) -> bool:
+        """True if an availability notification (open seats) for the course is in the cache."""
+        clean_code = sanitize_course_code(course_code)
+        with self.lock:
+            for key in self.sent_notifications:
+                code, _, spots = key.rpartition("_")
+                if sanitize_course_code(code) == clean_code and spots.isdigit() and int(spots) > 0:
+                    return True
+        return False
+
+    def close(self) -> None:
+        """Stop the delivery worker threads."""
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
@@ -6,16 +6,58 @@ import atexit
 import time
 import logging
 import os
-from config import COURSE_CODES, INTERVAL_MIN
+from config import (
+    COURSE_CODES, INTERVAL_MIN,
+    CYCLE_DEADLINE_SEC, OVERRUN_POLICY, COURSE_PRIORITIES,
+    CONFIG_WATCH_FILE, CONFIG_WATCH_SEC, load_watch_settings,
+    SHADOW_ENGINE, SHADOW_SAMPLE_RATE,
+    SCRAPE_ENGINE, FETCH_BATCH_SIZE, SCRAPE_RATE_PER_MIN,
+    BURST_WINDOW_SEC, BURST_INTERVAL_SEC, BURST_NEAR_SEATS,
+    API_HOST, API_PORT, API_SOCKET,
+    RESULT_CACHE_TTL_SEC, RESULT_CACHE_SIZE, RESULT_CACHE_TTL_OVERRIDES,
+)
 from scraper import CourseScraper
+from cache import ResultCache
+from shadow import ShadowVerifier
+from burst import BurstMonitor
+from api import SnapshotStore, AvailabilityAPI
 from notifier import NotificationService
+from utils import RateLimiter, sanitize_course_code, split_watch_key
 import os
 
 class CourseMonitor:
     def __init__(self):
         self.scraper = None
         self.notifier = None
+        self.cache = None
+        self.shadow = None
+        self.burst = None
+        # Shared by regular checks and burst polls
+        self.scrape_budget = RateLimiter(SCRAPE_RATE_PER_MIN)
+        self.snapshots = SnapshotStore()
+        self.api = None
         self.scheduler = None
+        # Hot-reloadable settings (see reload_config)
+        self.course_codes = list(COURSE_CODES)
+        self.interval_min = INTERVAL_MIN
+        self.cycle_deadline_sec = CYCLE_DEADLINE_SEC
+        self.course_priorities = dict(COURSE_PRIORITIES)
+        self.config_mtime = self.get_config_mtime()
+        self.carried_courses = []
+        self.avg_course_sec = 0.0
+        self.prefetch_avg_sec = 0.0
+        self.last_cache_clear = time.time()
+        self.cycle_stats = {
+            "cycles": 0,
+            "overruns": 0,
+            "last_duration_sec": 0.0,
+            "last_overrun_sec": 0.0,
+            "skipped_courses": 0,
+            "skipped_total": 0,
+            "shed_courses": 0,
+            "shed_total": 0,
+            "errors": 0,
+        }
         self.setup_components()
         self.setup_scheduler()
         self.setup_signal_handlers()
@@ -25,9 +67,37 @@ class CourseMonitor:
         try:
             self.scraper = CourseScraper()
             self.notifier = NotificationService()
+            self.cache = ResultCache(
+                self.scraper.get_engine(SCRAPE_ENGINE),
+                ttl=RESULT_CACHE_TTL_SEC,
+                max_size=RESULT_CACHE_SIZE,
+                ttl_overrides=RESULT_CACHE_TTL_OVERRIDES,
+            )
+            
+            if SHADOW_ENGINE:
+                self.shadow = ShadowVerifier(
+                    self.scraper.get_engine(SHADOW_ENGINE, shadow=True),
+                    SHADOW_ENGINE,
+                    sample_rate=SHADOW_SAMPLE_RATE,
+                )
+                logging.info(f"Shadow mode: comparing {SHADOW_SAMPLE_RATE:.0%} of checks against the {SHADOW_ENGINE} engine")
+            
+            if BURST_WINDOW_SEC > 0:
+                # The burst session reuses the saved cookies, but can't share the Chrome
+                # profile or debugging port, and must not overwrite the saved session
+                self.burst = BurstMonitor(
+                    lambda: CourseScraper(profile_path=None, debug_port=0, persist_session=False),
+                    SCRAPE_ENGINE,
+                    self.notifier,
+                    self.snapshots,
+                    self.scrape_budget,
+                    window=BURST_WINDOW_SEC,
+                    near_seats=BURST_NEAR_SEATS,
+                    forget=self.scraper.clear_fingerprints,
+                )
             
-            # Try to login if needed
-            if not self.scraper.login_if_needed():
+            # Reuse the saved session if it is still valid, otherwise log in
+            if not self.scraper.start_session():
                 logging.warning("Login may have failed, but continuing...")
             
         except Exception as e:
@@ -51,6 +121,10 @@ class CourseMonitor:
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
         
+        # SIGHUP forces a config reload (not available on Windows)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload_config())
+        
         # Register cleanup on exit
         atexit.register(self.cleanup)
     
@@ -58,68 +132,348 @@ class CourseMonitor:
         """Listen for job events and log them."""
         if event.exception:
             logging.error(f"Job crashed: {event.exception}")
-        else:
+        elif event.job_id == "course_check":
             logging.info("Job executed successfully")
     
+    def plan_cycle(self) -> list:
+        """
+        Decide which courses this cycle checks and in what order.
+        Carried-over courses go first; under the "shed" policy the lowest-priority
+        courses are dropped when the estimated cycle time exceeds the deadline.
+        Courses are then grouped by term so the browser switches terms as little as possible,
+        starting with the term it already has selected.
+        """
+        courses = list(self.course_codes)
+        
+        if self.carried_courses:
+            carried = [c for c in self.carried_courses if c in courses]
+            courses = carried + [c for c in courses if c not in carried]
+            self.carried_courses = []
+        
+        shed = []
+        if OVERRUN_POLICY == "shed" and self.avg_course_sec > 0:
+            budget = max(1, int(self.cycle_deadline_sec // self.avg_course_sec))
+            if budget < len(courses):
+                # Stable sort keeps COURSE_CODES order among equal priorities
+                ranked = sorted(courses, key=lambda c: -self.priority_of(c))
+                keep = set(ranked[:budget])
+                shed = [c for c in courses if c not in keep]
+                courses = [c for c in courses if c in keep]
+                logging.warning(f"Shedding {len(shed)} low-priority courses to fit the cycle deadline: {', '.join(shed)}")
+        
+        self.cycle_stats["shed_courses"] = len(shed)
+        self.cycle_stats["shed_total"] += len(shed)
+        
+        # The term the browser is still on from the last cycle goes first, so the cycle
+        # starts without re-selecting it; other terms in order of first appearance
+        terms = []
+        if self.scraper and self.scraper.active_term is not None:
+            terms.append(self.scraper.active_term)
+        course_terms = {c: split_watch_key(sanitize_course_code(c))[0] for c in courses}
+        for term in course_terms.values():
+            if term not in terms:
+                terms.append(term)
+        return sorted(courses, key=lambda c: terms.index(course_terms[c]))
+    
+    def priority_of(self, course_code: str) -> int:
+        """
+        COURSE_PRIORITIES value for a course (0 if unset). Codes are compared sanitized, and
+        a bare code ("CSCI2020U") also covers the course in every term.
+        """
+        priorities = {sanitize_course_code(k): v for k, v in self.course_priorities.items()}
+        clean_code = sanitize_course_code(course_code)
+        _, bare_code = split_watch_key(clean_code)
+        return priorities.get(clean_code, priorities.get(bare_code, 0))
+    
+    def handle_overrun(self, remaining: list) -> None:
+        """Apply OVERRUN_POLICY to the courses left unchecked when the deadline passed."""
+        self.cycle_stats["overruns"] += 1
+        self.cycle_stats["skipped_courses"] = len(remaining)
+        self.cycle_stats["skipped_total"] += len(remaining)
+        
+        if OVERRUN_POLICY == "carry":
+            self.carried_courses = remaining
+            logging.warning(f"Cycle deadline reached, carrying {len(remaining)} courses into the next cycle")
+        else:
+            logging.warning(f"Cycle deadline reached, skipping {len(remaining)} courses this cycle")
+    
     def check_all_courses(self) -> None:
-        """Main job function - check all courses for availability."""
-        logging.info(f"Starting course availability check for {len(COURSE_CODES)} courses")
+        """Main job function - check all courses for availability within the cycle deadline."""
+        cycle_start = time.monotonic()
+        deadline = cycle_start + self.cycle_deadline_sec
+        self.cycle_stats["skipped_courses"] = 0
+        self.cycle_stats["errors"] = 0
+        
+        courses = self.plan_cycle()
+        logging.info(f"Starting course availability check for {len(courses)} courses")
         
         found_available = False
+        prefetched = {}  # batch results from the fetch engine, by course code
         
-        for course_code in COURSE_CODES:
+        for index, course_code in enumerate(courses):
+            if time.monotonic() >= deadline:
+                self.handle_overrun(courses[index:])
+                break
+            
+            if self.burst and self.burst.is_active(course_code):
+                logging.info(f"{course_code} is in burst mode, skipping the regular check")
+                continue
+            
+            course_start = time.monotonic()
             try:
-                spots = self.scraper.check_course(course_code)
+                clean_code = sanitize_course_code(course_code)
+                if (SCRAPE_ENGINE == "fetch" and clean_code not in prefetched
+                        and self.cache.peek(course_code) is None):
+                    prefetched.update(self.prefetch(courses[index:], deadline))
+                if clean_code in prefetched:
+                    # Fresh batch result (prefetch also cached it, for duplicates)
+                    was_cached = False
+                    result = prefetched.pop(clean_code)
+                    check_seconds = self.prefetch_avg_sec
+                else:
+                    # Duplicate or recently checked courses are answered from the cache
+                    was_cached = self.cache.peek(course_code) is not None
+                    result = self.cache.get(course_code)
+                    check_seconds = time.monotonic() - course_start
+                spots = result.seats
+                self.snapshots.update(result)
+                if not was_cached:
+                    # Regular checks never wait for the budget, but they use it up first
+                    self.scrape_budget.try_acquire()
                 
-                if spots > 0:
+                if result.unchanged:
+                    # Same rows as last check: notifications are already up to date
+                    logging.info(f"{course_code} unchanged since last check ({spots} seats)")
+                elif not result.ok:
+                    # Not the same as "no seats" - the check itself failed
+                    logging.warning(f"Could not check {course_code}: {result.error}")
+                    self.cycle_stats["errors"] += 1
+                elif spots > 0:
                     logging.info(f"SUCCESS: Found {spots} available spots for {course_code}!")
                     
                     # Send notification
-                    if self.notifier.send_sms(course_code, spots):
+                    if self.notifier.notify(result.key, spots):
                         found_available = True
                     else:
                         logging.error(f"Failed to send notification for {course_code}")
+                        # Evaluate it fully again next cycle so the notification is retried
+                        self.scraper.clear_fingerprints(result.key)
                 
-                # Small delay between course checks to be respectful
-                time.sleep(2)
+                # Courses that just opened or are about to change get polled more often
+                if self.burst:
+                    self.burst.observe(result)
+                
+                # Small delay between course checks to be respectful (failed or
+                # circuit-open checks didn't load the results page, and the fetch
+                # engine paces its own requests)
+                if not was_cached and result.ok:
+                    if SCRAPE_ENGINE == "fetch":
+                        self.record_course_duration(check_seconds)
+                    else:
+                        time.sleep(2)
+                        self.record_course_duration(time.monotonic() - course_start)
+                
+                # Compare a sample of fresh checks against the shadow engine;
+                # only the primary result above drives notifications. Runs after
+                # the duration is recorded so shadow time doesn't count towards it
+                if self.shadow and not was_cached:
+                    self.shadow.maybe_verify(result, check_seconds)
                 
             except Exception as e:
                 logging.error(f"Error checking course {course_code}: {e}")
                 continue
         
+        cycle_duration = time.monotonic() - cycle_start
+        self.cycle_stats["cycles"] += 1
+        self.cycle_stats["last_duration_sec"] = round(cycle_duration, 2)
+        self.cycle_stats["last_overrun_sec"] = round(max(0.0, cycle_duration - self.cycle_deadline_sec), 2)
+        
         if found_available:
             logging.info("Course availability check completed - notifications sent!")
         else:
             logging.info("Course availability check completed - no spots available")
+        logging.info(f"Cycle took {cycle_duration:.1f}s of {self.cycle_deadline_sec:.0f}s deadline (stats: {self.cycle_stats})")
+        if self.cycle_stats["errors"]:
+            logging.warning(f"{self.cycle_stats['errors']} course checks failed this cycle (breakers: {self.scraper.breaker_stats()})")
+        
+        # Periodically clear notification cache (every 24 hours of wall-clock time)
+        if time.time() - self.last_cache_clear >= 24 * 60 * 60:
+            self.notifier.clear_notification_cache()
+            # Unchanged courses skip notifications, so re-evaluate them all after a clear
+            self.scraper.clear_fingerprints()
+            self.last_cache_clear = time.time()
+            logging.info(f"Result cache stats: {self.cache.stats()}")
+            if self.shadow:
+                logging.info(f"Shadow stats: {self.get_shadow_stats()}")
+    
+    def prefetch(self, courses: list, deadline: float) -> dict:
+        """
+        Check the next batch of uncached courses in one in-page fetch call and cache them.
+        Courses in burst mode are left out, and the batch is capped to what is expected
+        to finish before the cycle deadline.
+        """
+        batch_size = FETCH_BATCH_SIZE
+        if self.prefetch_avg_sec > 0:
+            fits = int((deadline - time.monotonic()) // self.prefetch_avg_sec)
+            batch_size = max(1, min(batch_size, fits))
+        
+        batch = []
+        for course_code in courses:
+            clean_code = sanitize_course_code(course_code)
+            if self.burst and self.burst.is_active(clean_code):
+                continue
+            if clean_code not in batch and self.cache.peek(clean_code) is None:
+                batch.append(clean_code)
+            if len(batch) >= batch_size:
+                break
         
-        # Periodically clear notification cache (every 24 hours worth of checks)
-        checks_per_day = (24 * 60) // INTERVAL_MIN
-        if hasattr(self, 'check_count'):
-            self.check_count += 1
+        logging.info(f"Fetching {len(batch)} courses in one batch")
+        batch_start = time.monotonic()
+        results = self.scraper.check_courses_fetch(batch)
+        self.prefetch_avg_sec = (time.monotonic() - batch_start) / max(1, len(batch))
+        for result in results.values():
+            self.cache.put(result)
+        return results
+    
+    def record_course_duration(self, duration: float) -> None:
+        """Keep a moving average of how long one uncached course check takes."""
+        if self.avg_course_sec == 0:
+            self.avg_course_sec = duration
         else:
-            self.check_count = 1
+            self.avg_course_sec = 0.8 * self.avg_course_sec + 0.2 * duration
+    
+    def get_cycle_stats(self) -> dict:
+        """Return cycle duration, overrun and skipped-course counters."""
+        return dict(self.cycle_stats, avg_course_sec=round(self.avg_course_sec, 2))
+    
+    def get_shadow_stats(self) -> dict:
+        """Return shadow engine agreement and latency statistics (empty if shadow mode is off)."""
+        return self.shadow.stats() if self.shadow else {}
+    
+    def get_stats(self) -> dict:
+        """Return all monitor statistics (served by the local API)."""
+        return {
+            "courses": self.course_codes,
+            "interval_min": self.interval_min,
+            "cycle": self.get_cycle_stats(),
+            "cache": self.cache.stats(),
+            "fingerprints": self.scraper.fingerprint_stats(),
+            "breakers": self.scraper.breaker_stats(),
+            "shadow": self.get_shadow_stats(),
+            "burst": self.burst.stats() if self.burst else {},
+        }
+    
+    def start_api(self) -> None:
+        """Start the local availability API if a port or socket is configured."""
+        if not API_PORT and not API_SOCKET:
+            return
+        try:
+            self.api = AvailabilityAPI(
+                self.snapshots,
+                self.get_stats,
+                host=API_HOST,
+                port=API_PORT,
+                socket_path=API_SOCKET,
+            )
+            self.api.start()
+        except Exception as e:
+            logging.error(f"Failed to start availability API, continuing without it: {e}")
+            self.api = None
+    
+    def get_config_mtime(self):
+        """Return the watched config file's modification time, or None if there is none."""
+        try:
+            return os.stat(CONFIG_WATCH_FILE).st_mtime if CONFIG_WATCH_FILE else None
+        except OSError:
+            return None
+    
+    def check_config_changes(self) -> None:
+        """Reload the config if the watched file changed since the last check."""
+        mtime = self.get_config_mtime()
+        if mtime is not None and mtime != self.config_mtime:
+            self.config_mtime = mtime
+            self.reload_config()
+    
+    def reload_config(self) -> None:
+        """Apply course and interval changes from the config file to the running monitor."""
+        try:
+            settings = load_watch_settings(CONFIG_WATCH_FILE)
+        except Exception as e:
+            logging.error(f"Failed to reload {CONFIG_WATCH_FILE}, keeping current settings: {e}")
+            return
         
-        if self.check_count >= checks_per_day:
-            self.notifier.clear_notification_cache()
-            self.check_count = 0
+        if not settings["course_codes"]:
+            logging.error("Reloaded config has no COURSE_CODES, keeping current courses")
+        elif settings["course_codes"] != self.course_codes:
+            added = [c for c in settings["course_codes"] if c not in self.course_codes]
+            removed = [c for c in self.course_codes if c not in settings["course_codes"]]
+            self.course_codes = settings["course_codes"]
+            for course_code in removed:
+                self.cache.invalidate(course_code)
+                self.snapshots.remove(course_code)
+            logging.info(f"Courses updated - added: {', '.join(added) or 'none'}, removed: {', '.join(removed) or 'none'}")
+        
+        self.course_priorities = settings["course_priorities"]
+        self.cycle_deadline_sec = settings["cycle_deadline_sec"]
+        
+        if settings["interval_min"] != self.interval_min:
+            self.interval_min = settings["interval_min"]
+            if self.scheduler.get_job("course_check"):
+                self.scheduler.reschedule_job("course_check", trigger="interval", minutes=self.interval_min)
+            logging.info(f"Check interval changed to {self.interval_min} minutes")
     
     def start(self) -> None:
         """Start the monitoring service."""
         try:
             logging.info(f"Starting Course Availability Notifier")
-            logging.info(f"Monitoring courses: {', '.join(COURSE_CODES)}")
-            logging.info(f"Check interval: {INTERVAL_MIN} minutes")
-            logging.info(f"Notifications will be sent to: {os.getenv('TWILIO_TO', 'CONFIGURED_NUMBER')}")
+            logging.info(f"Monitoring courses: {', '.join(self.course_codes)}")
+            logging.info(f"Check interval: {self.interval_min} minutes")
+            logging.info(f"Cycle deadline: {self.cycle_deadline_sec:.0f}s (overrun policy: {OVERRUN_POLICY})")
+            logging.info(f"Notifications will be sent to: {self.notifier.describe_recipients()}")
             
             # Schedule the job
             self.scheduler.add_job(
                 func=self.check_all_courses,
                 trigger="interval",
-                minutes=INTERVAL_MIN,
+                minutes=self.interval_min,
                 id="course_check",
-                name="Course Availability Check"
+                name="Course Availability Check",
+                # Never stack overlapping cycles; collapse missed runs into one
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=self.interval_min * 60
             )
             
+            # Watch the config file and apply changes without restarting the browser
+            if CONFIG_WATCH_SEC > 0 and self.config_mtime is not None:
+                self.scheduler.add_job(
+                    func=self.check_config_changes,
+                    trigger="interval",
+                    seconds=CONFIG_WATCH_SEC,
+                    id="config_watch",
+                    name="Config Watch",
+                    max_instances=1,
+                    coalesce=True
+                )
+                logging.info(f"Watching {CONFIG_WATCH_FILE} for changes every {CONFIG_WATCH_SEC:.0f}s")
+            
+            # Poll bursting courses on their own session between regular cycles
+            if self.burst:
+                self.scheduler.add_job(
+                    func=self.burst.poll,
+                    trigger="interval",
+                    seconds=BURST_INTERVAL_SEC,
+                    id="burst_poll",
+                    name="Burst Poll",
+                    max_instances=1,
+                    coalesce=True
+                )
+                logging.info(f"Burst mode: polling every {BURST_INTERVAL_SEC:.0f}s for {BURST_WINDOW_SEC:.0f}s "
+                             f"(budget {SCRAPE_RATE_PER_MIN:.0f} checks/min)")
+            
+            # Serve snapshots to local tools while we monitor
+            self.start_api()
+            
             # Run once immediately
             logging.info("Running initial course check...")
             self.check_all_courses()
@@ -143,9 +497,17 @@ class CourseMonitor:
             self.scheduler.shutdown()
             logging.info("Scheduler stopped")
         
+        if self.api:
+            self.api.stop()
+            self.api = None
+        
         self.cleanup()
     
     def cleanup(self) -> None:
         """Clean up resources."""
         if self.scraper:
-            self.scraper.close() 
\ No newline at end of file
+            self.scraper.close()
+        if self.burst:
+            self.burst.close()
+        if self.notifier:
+            self.notifier.close() 
\ No newline at end of file
@@ -6,15 +6,306 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
+from typing import Callable, Dict, List, Optional
 import re
+import os
+import json
+import hashlib
 import logging
 import time
-from config import HEADLESS, SITE_USERNAME, SITE_PASSWORD, BASE_URL
-from utils import sanitize_course_code
+from config import (
+    HEADLESS, SITE_USERNAME, SITE_PASSWORD, BASE_URL, LOG_ROW_SAMPLE_EVERY, EXTRACTION_MODE,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_BACKOFF_SEC, BREAKER_MAX_BACKOFF_SEC,
+    DEFAULT_TERM, TERM_CODES, FETCH_PAGE_SIZE, FETCH_DELAY_MS, FETCH_TIMEOUT_SEC, RESULTS_MAX_PAGES,
+    CHROME_PROFILE_PATH, SESSION_FILE, SESSION_MAX_AGE_SEC,
+)
+from utils import sanitize_course_code, split_watch_key, watch_key
+from models import CourseResult, SectionResult
+from breaker import CircuitBreaker, CircuitOpenError
+from cache import FingerprintStore
+
+# URL fragments that mean we're on the SSO / login page
+LOGIN_INDICATORS = ["login", "saml", "sign", "auth", "sts.dc-uoit.ca", "adfs", "shibboleth"]
+
+# Cookie fields accepted by CDP Network.setCookies
+COOKIE_FIELDS = ("name", "value", "domain", "path", "expires", "httpOnly", "secure", "sameSite")
+
+TERM_PAGE_INDICATORS = [
+    "terms open for registration"
+]
+
+# data-property cells pulled from each results row
+ROW_PROPERTIES = ["subject", "courseNumber", "scheduleType", "status", "courseReferenceNumber", "sequenceNumber"]
+REQUIRED_ROW_PROPERTIES = ["subject", "courseNumber", "scheduleType", "status"]
+
+# Text is gathered like BeautifulSoup's get_text(strip=True): each text node
+# stripped and concatenated, so both extraction paths produce identical rows.
+_JS_TEXT_HELPER = """
+function cellText(el) {
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null, false);
+    var parts = [];
+    while (walker.nextNode()) {
+        var part = walker.currentNode.nodeValue.trim();
+        if (part) parts.push(part);
+    }
+    return parts.join('');
+}
+"""
+
+PAGE_STATE_SCRIPT = """
+var indicators = arguments[0];
+var text = (document.documentElement.textContent || '').toLowerCase();
+return {
+    isTermPage: indicators.some(function (indicator) { return text.indexOf(indicator) !== -1; }),
+    hasSelect: document.querySelector('select') !== null
+};
+"""
+
+PAGE_SHOWS_TERM_SCRIPT = """
+var text = (document.body ? document.body.textContent : '').toLowerCase().replace(/\\s+/g, ' ');
+return text.indexOf(arguments[0]) !== -1;
+"""
+
+EXTRACT_ROWS_SCRIPT = _JS_TEXT_HELPER + """
+var wanted = arguments[0];
+var required = ['subject', 'courseNumber', 'scheduleType', 'status'];
+var rows = [];
+var trs = document.querySelectorAll('table tr');
+for (var r = 0; r < trs.length; r++) {
+    var tr = trs[r];
+    if (tr.querySelectorAll('td, th').length < 5) continue;  // Skip header or incomplete rows
+    var row = {};
+    for (var p = 0; p < wanted.length; p++) {
+        var cell = tr.querySelector('td[data-property="' + wanted[p] + '"]');
+        if (!cell) continue;
+        var text = wanted[p] === 'status' ? (cell.getAttribute('title') || '').trim() : '';
+        row[wanted[p]] = text || cellText(cell);
+    }
+    if (required.every(function (name) { return name in row; })) rows.push(row);
+}
+return rows;
+"""
+
+# Banner's results pager: switch to the largest page size it offers, and go to
+# the next page. Both return null/false when there is nothing to do.
+MAX_PAGE_SIZE_SCRIPT = """
+var select = document.querySelector('select.page-size-select');
+if (!select || !select.options.length) return null;
+var largest = Math.max.apply(null, Array.prototype.map.call(select.options, function (option) {
+    return parseInt(option.value, 10) || 0;
+}));
+if ((parseInt(select.value, 10) || 0) >= largest) return null;
+select.value = String(largest);
+select.dispatchEvent(new Event('change', {bubbles: true}));
+return largest;
+"""
+
+NEXT_PAGE_SCRIPT = """
+var next = document.querySelector('button.paging-control.next');
+if (!next || next.disabled || /disabled/.test(next.className)) return false;
+next.click();
+return true;
+"""
+
+def fingerprint_row(digest, row: dict) -> None:
+    """Add one extracted row to a fingerprint digest (only the cells parse_rows looks at)."""
+    for prop in ROW_PROPERTIES:
+        digest.update(str(row.get(prop, "")).encode())
+        digest.update(b"\x1f")
+    digest.update(b"\x1e")
+
+def fingerprint_rows(rows: list) -> bytes:
+    """Fast digest of extracted rows."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        fingerprint_row(digest, row)
+    return digest.digest()
+
+def parse_seats(status_text: str) -> int:
+    """Extract the number of open seats from a Banner status cell text."""
+    # Pattern 1: "X of Y seats remain/rem..." (case-insensitive, flexible spacing)
+    seats_remaining_match = re.search(r'(\d+)\s*of\s*\d+\s*seats?\s*rem(?:ain)?', status_text, re.IGNORECASE)
+    if seats_remaining_match:
+        section_seats = int(seats_remaining_match.group(1))
+        logging.debug("PARSED: Section has %s seats remaining", section_seats)
+        return section_seats
+    
+    # Pattern 1b: More flexible "X of Y" pattern (backup, flexible spacing)
+    flexible_match = re.search(r'(\d+)\s*of\s*(\d+)', status_text)
+    if flexible_match:
+        section_seats = int(flexible_match.group(1))
+        total_seats = int(flexible_match.group(2))
+        logging.debug("PARSED: Section has %s of %s seats available", section_seats, total_seats)
+        return section_seats
+    
+    # Pattern 2: "FULL: 0 of X" - just log it
+    if 'FULL:' in status_text and '0 of' in status_text:
+        logging.debug("PARSED: Section is full (0 seats)")
+        return 0
+    
+    # Pattern 3: Check for "OPEN" status
+    if 'OPEN' in status_text.upper():
+        # Try to extract number if available
+        open_match = re.search(r'(\d+)', status_text)
+        if open_match:
+            section_seats = int(open_match.group(1))
+            logging.debug("PARSED: Section is open with %s seats", section_seats)
+            return section_seats
+        logging.debug("PARSED: Section is open (assuming 1+ seats)")
+        return 1  # At least 1 spot available
+    
+    return 0
+
+HAS_SEARCH_SESSION_SCRIPT = """
+return window.location.pathname.indexOf('/ssb/') !== -1 &&
+    document.querySelector('meta[name="synchronizerToken"]') !== null;
+"""
+
+# Calls Banner 9's class search endpoints with the page's own cookies and CSRF token.
+# Rows use the same keys as the results table so parse_rows handles both.
+FETCH_SEARCH_SCRIPT = """
+var codes = arguments[0], termCode = arguments[1], termLabel = arguments[2];
+var pageMaxSize = arguments[3], delayMs = arguments[4], maxPages = arguments[5];
+var done = arguments[arguments.length - 1];
+
+var meta = document.querySelector('meta[name="synchronizerToken"]');
+var headers = {
+    'X-Requested-With': 'XMLHttpRequest',
+    'X-Synchronizer-Token': meta ? meta.getAttribute('content') : ''
+};
+var base = window.location.pathname.split('/ssb/')[0] + '/ssb/';
+var sessionId = sessionStorage.getItem('xe.unique.session.storage.id') || '';
+
+function request(url, method) {
+    return fetch(url, {method: method || 'GET', credentials: 'same-origin', headers: headers});
+}
+
+function getJson(url) {
+    return request(url).then(function (response) {
+        var type = response.headers.get('content-type') || '';
+        if (!response.ok) throw new Error('HTTP ' + response.status);
+        if (type.indexOf('json') === -1) throw new Error('session expired (got ' + type + ')');
+        return response.json();
+    });
+}
+
+function sleep(ms) {
+    return new Promise(function (resolve) { setTimeout(resolve, ms); });
+}
+
+function resolveTerm() {
+    if (termCode) return Promise.resolve(termCode);
+    return getJson(base + 'classSearch/getTerms?searchTerm=' + encodeURIComponent(termLabel) + '&offset=1&max=10')
+        .then(function (terms) {
+            if (!terms.length) throw new Error('no term matching ' + termLabel);
+            return terms[0].code;
+        });
+}
+
+function toRow(item) {
+    var seats = item.seatsAvailable;
+    return {
+        subject: item.subject,
+        courseNumber: item.courseNumber,
+        scheduleType: item.scheduleTypeDescription,
+        status: (seats <= 0 ? 'FULL: ' : '') + Math.max(seats, 0) + ' of ' + item.maximumEnrollment + ' seats remain.' +
+            (item.waitCapacity > 0 ? ' ' + Math.max(item.waitAvailable, 0) + ' of ' + item.waitCapacity + ' waitlist seats remain.' : ''),
+        courseReferenceNumber: String(item.courseReferenceNumber),
+        sequenceNumber: String(item.sequenceNumber)
+    };
+}
+
+// Pages through the results until totalCount; the server may cap pageMaxSize,
+// so the offset advances by however many rows each page actually returned.
+function searchPage(code, term, offset) {
+    var query = 'txt_subjectcoursecombo=' + encodeURIComponent(code) +
+        '&txt_term=' + encodeURIComponent(term) +
+        '&startDatepicker=&endDatepicker=&uniqueSessionId=' + encodeURIComponent(sessionId) +
+        '&pageOffset=' + offset + '&pageMaxSize=' + pageMaxSize +
+        '&sortColumn=subjectDescription&sortDirection=asc';
+    return getJson(base + 'searchResults/searchResults?' + query).then(function (payload) {
+        if (payload.success === false) throw new Error('search failed');
+        return payload;
+    });
+}
+
+function search(code, term) {
+    var entry = {rows: [], total: 0, pages: 0};
+    function next(offset) {
+        return searchPage(code, term, offset).then(function (payload) {
+            var data = payload.data || [];
+            entry.rows = entry.rows.concat(data.map(toRow));
+            entry.total = payload.totalCount || entry.rows.length;
+            entry.pages += 1;
+            if (data.length && entry.rows.length < entry.total && entry.pages < maxPages) {
+                return next(offset + data.length);
+            }
+            return entry;
+        });
+    }
+    return request(base + 'classSearch/resetDataForm', 'POST').then(function () { return next(0); });
+}
+
+resolveTerm().then(function (term) {
+    var results = {};
+    var chain = Promise.resolve();
+    codes.forEach(function (code, index) {
+        chain = chain.then(function () {
+            return search(code, term)
+                .then(function (entry) { results[code] = entry; })
+                .catch(function (error) { results[code] = {error: String(error.message || error)}; })
+                .then(function () { if (index < codes.length - 1) return sleep(delayMs); });
+        });
+    });
+    return chain.then(function () { done({term: term, results: results}); });
+}).catch(function (error) {
+    done({error: String(error.message || error)});
+});
+"""
+
+class StageError(Exception):
+    """A stage of the course check (login, term, search) failed."""
+    
+    def __init__(self, stage: str, message: str):
+        super().__init__(f"{stage} failed: {message}")
+        self.stage = stage
+
+class EngineState:
+    """
+    Circuit breakers and row fingerprints for one engine. An engine run in shadow mode
+    gets its own, so its failures can't open the primary engine's breakers and its
+    results can't overwrite the fingerprints that decide whether the primary notifies.
+    """
+    
+    def __init__(self, stages: tuple, prefix: str = ""):
+        self.breakers = {
+            stage: CircuitBreaker(
+                f"{prefix}{stage}",
+                failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                backoff=BREAKER_BACKOFF_SEC,
+                max_backoff=BREAKER_MAX_BACKOFF_SEC,
+            )
+            for stage in stages
+        }
+        self.fingerprints = FingerprintStore()
 
 class CourseScraper:
-    def __init__(self):
+    STAGES = ("login", "term", "search")
+    
+    def __init__(self, profile_path: Optional[str] = CHROME_PROFILE_PATH, debug_port: int = 9222,
+                 persist_session: bool = True):
+        # A second scraper must not share the first one's Chrome profile directory or
+        # debugging port (0 lets Chrome pick a free one), nor overwrite its SESSION_FILE
+        self.profile_path = profile_path
+        self.debug_port = debug_port
+        self.persist_session = persist_session
         self.driver = None
+        # Per-term context: Banner term codes (filled in as terms are looked up) and
+        # the term currently selected on the UI search page, so checks don't re-select it
+        self.term_codes = dict(TERM_CODES)
+        self.active_term = None
+        self.fetch_session_stale = False
+        self.primary = EngineState(self.STAGES)
         self.setup_driver()
     
     def setup_driver(self) -> None:
@@ -32,18 +323,25 @@ class CourseScraper:
             chrome_options.add_argument("--disable-plugins")
             chrome_options.add_argument("--disable-images")
             chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--remote-debugging-port=9222")
+            chrome_options.add_argument(f"--remote-debugging-port={self.debug_port}")
             
             if HEADLESS:
                 chrome_options.add_argument("--headless=new")  # Use new headless mode
             
+            # Dedicated profile keeps the SSO session across restarts (opt-in,
+            # since profiles have caused crashes on some systems)
+            if self.profile_path:
+                chrome_options.add_argument(f"--user-data-dir={os.path.abspath(self.profile_path)}")
+            
             # Try to initialize driver
             try:
-                # First try without profile (since profile causes crashes on this system)
                 self.driver = webdriver.Chrome(options=chrome_options)
-                logging.info("Chrome initialized successfully without profile")
+                if self.profile_path:
+                    logging.info("Chrome initialized successfully with profile %s", self.profile_path)
+                else:
+                    logging.info("Chrome initialized successfully without profile")
             except Exception as chrome_error:
-                logging.warning(f"Chrome initialization failed: {chrome_error}")
+                logging.warning("Chrome initialization failed: %s", chrome_error)
                 logging.info("Trying with webdriver-manager...")
                 
                 # Try with webdriver-manager for automatic ChromeDriver management
@@ -55,7 +353,7 @@ class CourseScraper:
                     self.driver = webdriver.Chrome(service=service, options=chrome_options)
                     logging.info("Successfully initialized with webdriver-manager")
                 except Exception as wdm_error:
-                    logging.warning(f"Webdriver-manager failed: {wdm_error}")
+                    logging.warning("Webdriver-manager failed: %s", wdm_error)
                     logging.info("Trying simplified options...")
                     
                     # Last fallback - minimal options
@@ -79,7 +377,7 @@ class CourseScraper:
             logging.info("Chrome WebDriver initialized successfully")
             
         except Exception as e:
-            logging.error(f"Failed to initialize WebDriver: {e}")
+            logging.error("Failed to initialize WebDriver: %s", e)
             logging.error("Please ensure Chrome and ChromeDriver are installed and compatible")
             raise
     
@@ -92,11 +390,11 @@ class CourseScraper:
         try:
             # Check if we're on a login page (SAML, login, or sign-in in URL)
             current_url = self.driver.current_url.lower()
-            login_indicators = ["login", "saml", "sign", "auth", "sts.dc-uoit.ca", "adfs", "shibboleth"]
+            login_indicators = LOGIN_INDICATORS
             is_login_page = any(keyword in current_url for keyword in login_indicators)
             
-            logging.info(f"Current URL: {current_url}")
-            logging.info(f"Login page detected: {is_login_page}")
+            logging.info("Current URL: %s", current_url)
+            logging.info("Login page detected: %s", is_login_page)
             
             if is_login_page:
                 logging.info("Login page detected, attempting to log in...")
@@ -123,7 +421,7 @@ class CourseScraper:
                     try:
                         username_field = self.driver.find_element(By.CSS_SELECTOR, selector)
                         if username_field.is_displayed():
-                            logging.info(f"Found username field with selector: {selector}")
+                            logging.info("Found username field with selector: %s", selector)
                             break
                     except:
                         continue
@@ -142,7 +440,7 @@ class CourseScraper:
                     try:
                         password_field = self.driver.find_element(By.CSS_SELECTOR, selector)
                         if password_field.is_displayed():
-                            logging.info(f"Found password field with selector: {selector}")
+                            logging.info("Found password field with selector: %s", selector)
                             break
                     except:
                         continue
@@ -168,6 +466,7 @@ class CourseScraper:
                         new_url = self.driver.current_url.lower()
                         if not any(keyword in new_url for keyword in login_indicators):
                             logging.info("SUCCESS: Login successful with ENTER key!")
+                            self.save_session()
                             return True
                         else:
                             logging.info("ENTER key didn't work, trying sign in button...")
@@ -197,11 +496,11 @@ class CourseScraper:
                             if signin_button.is_displayed() and signin_button.is_enabled():
                                 # Click immediately after finding the button
                                 signin_button.click()
-                                logging.info(f"SUCCESS: IMMEDIATELY clicked sign in button with selector: {selector}")
+                                logging.info("SUCCESS: IMMEDIATELY clicked sign in button with selector: %s", selector)
                                 signin_clicked = True
                                 break
                         except Exception as e:
-                            logging.debug(f"Selector {selector} failed: {e}")
+                            logging.debug("Selector %s failed: %s", selector, e)
                             continue
                     
                     if not signin_clicked:
@@ -214,11 +513,12 @@ class CourseScraper:
                     
                     # Check if we're redirected away from login page
                     new_url = self.driver.current_url.lower()
-                    logging.info(f"After login submission - URL: {new_url}")
+                    logging.info("After login submission - URL: %s", new_url)
                     
                     # Check if we're no longer on login/SAML page
                     if not any(keyword in new_url for keyword in login_indicators):
                         logging.info("Login appears successful - redirected to new page")
+                        self.save_session()
                         return True
                     else:
                         logging.warning("Still on login page after submission")
@@ -233,7 +533,73 @@ class CourseScraper:
                 return True
             
         except Exception as e:
-            logging.error(f"Login process failed: {e}")
+            logging.error("Login process failed: %s", e)
+            return False
+    
+    def is_login_page(self) -> bool:
+        """True if the browser is currently on the SSO / login page."""
+        current_url = self.driver.current_url.lower()
+        return any(keyword in current_url for keyword in LOGIN_INDICATORS)
+    
+    def start_session(self) -> bool:
+        """
+        Get to a logged-in state as cheaply as possible: restore the saved session,
+        validate it with a single page load, and only fall back to a full login if needed.
+        """
+        restored = self.restore_session()
+        
+        self.driver.get(BASE_URL)
+        if restored and not self.is_login_page():
+            logging.info("Restored session is still valid, skipping login")
+            return True
+        
+        if restored:
+            logging.info("Restored session was rejected, logging in again")
+        return self.login_if_needed()
+    
+    def save_session(self) -> None:
+        """Save the browser's cookies (all domains, including SSO) to SESSION_FILE."""
+        if not SESSION_FILE or not self.persist_session:
+            return
+        try:
+            cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            data = {"saved_at": time.time(), "cookies": cookies}
+            
+            # Cookies are as good as a password: keep the file private
+            fd = os.open(SESSION_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            logging.info("Saved %s session cookies to %s", len(cookies), SESSION_FILE)
+        except Exception as e:
+            logging.warning("Could not save session: %s", e)
+    
+    def restore_session(self) -> bool:
+        """Load unexpired cookies from SESSION_FILE into the browser. Returns True if any were restored."""
+        if not SESSION_FILE or not os.path.exists(SESSION_FILE):
+            return False
+        try:
+            with open(SESSION_FILE) as f:
+                data = json.load(f)
+            
+            now = time.time()
+            if now - data["saved_at"] > SESSION_MAX_AGE_SEC:
+                logging.info("Saved session is older than %ss, ignoring it", SESSION_MAX_AGE_SEC)
+                return False
+            
+            # Session cookies have expires <= 0; drop persistent ones that have expired
+            cookies = [
+                {k: v for k, v in cookie.items() if k in COOKIE_FIELDS}
+                for cookie in data["cookies"]
+                if cookie.get("expires", -1) <= 0 or cookie["expires"] > now
+            ]
+            if not cookies:
+                return False
+            
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+            logging.info("Restored %s session cookies saved %.0f minutes ago", len(cookies), (now - data["saved_at"]) / 60)
+            return True
+        except Exception as e:
+            logging.warning("Could not restore session: %s", e)
             return False
     
     def check_course(self, course_code: str) -> int:
@@ -241,446 +607,746 @@ class CourseScraper:
         Check availability for a specific course code on Ontario Tech University system.
         Returns number of available lecture seats, or 0 if none/error.
         """
+        return self.check_course_result(course_code).seats
+    
+    def check_course_result(self, course_code: str, extraction: Optional[str] = None,
+                            state: Optional[EngineState] = None) -> CourseResult:
+        """
+        Check availability for a specific course code, keeping per-section details.
+        Returns a CourseResult whose seats is the maximum over matching lecture sections.
+        If the check could not be completed, result.error says why (seats stays 0).
+        extraction overrides EXTRACTION_MODE ("script" or "source") for this check.
+        course_code may carry a term prefix ("FALL2025:CSCI2000U").
+        state holds the engine's breakers and fingerprints (the primary engine's by default).
+        """
+        state = state or self.primary
+        # Clean course code
+        term, clean_code = split_watch_key(course_code)
+        result = CourseResult(course_code=clean_code, term=term)
         try:
-            # Clean course code
-            clean_code = sanitize_course_code(course_code)
-            logging.info(f"Checking course {clean_code}")
+            logging.info("Checking course %s (%s)", clean_code, self.term_label(term))
             
-            # Navigate to base URL
-            self.driver.get(BASE_URL)
+            # Same term as the last check: go straight back to the search form
+            if not self.return_to_search(term):
+                # Step 1: Navigate and handle login (it always appears first)
+                self.run_stage("login", self.open_search_page, state=state)
+                
+                # Step 2: Select the term if we landed on the term selection page
+                self.run_stage("term", self.select_term_if_needed, term, state=state)
             
-            # Step 1: IMMEDIATELY handle login since it always appears first
-            logging.info("Checking for login page immediately after navigation...")
-            time.sleep(2)  # Wait for page to load
+            # Step 3: Search for the course and wait for the results table
+            self.run_stage("search", self.search_course, clean_code, state=state)
             
-            # Handle login first (this always happens)
-            if not self.login_if_needed():
-                logging.error("Login failed, cannot proceed")
-                return 0
+            # Step 4: Parse results (all pages), unless they match the last check
+            logging.info("Search results loaded, parsing course data...")
+            rows = self.iter_result_rows(extraction)
+            return self.parse_rows_if_changed(rows, clean_code, result, state)
             
-            # Step 2: Check if we need to select term or if we're already at registration page
+        except CircuitOpenError as e:
+            logging.warning("Skipping %s: %s", clean_code, e)
+            result.error = str(e)
+        except StageError as e:
+            logging.error("Error checking course %s: %s", clean_code, e)
+            result.error = str(e)
+        except TimeoutException:
+            logging.error("Timeout while checking course %s", clean_code)
+            result.error = "timeout"
+        except Exception as e:
+            logging.error("Error checking course %s: %s", clean_code, e)
+            result.error = str(e)
+        return result
+    
+    def run_stage(self, stage: str, func, *args, state: Optional[EngineState] = None):
+        """
+        Run one stage of the check behind its circuit breaker and return its result.
+        Raises CircuitOpenError without running it while the breaker is open,
+        or StageError if the stage fails (which counts against the breaker).
+        """
+        breaker = (state or self.primary).breakers[stage]
+        if not breaker.allow():
+            raise CircuitOpenError(stage, breaker.retry_in())
+        
+        try:
+            ok = func(*args)
+        except Exception as e:
+            breaker.record_failure()
+            raise StageError(stage, str(e)) from e
+        
+        if not ok:
+            breaker.record_failure()
+            raise StageError(stage, "stage did not complete")
+        breaker.record_success()
+        return ok
+    
+    def get_engine(self, name: str, shadow: bool = False) -> Callable[[str], CourseResult]:
+        """
+        Return a check function for a named engine.
+        "browser" is the full UI flow with EXTRACTION_MODE; "script" and "source" force an
+        extraction mode; "fetch" queries Banner's search endpoint from inside the page.
+        A shadow engine gets its own EngineState instead of sharing the primary's.
+        """
+        state = EngineState(self.STAGES, prefix=f"shadow {name} ") if shadow else self.primary
+        if name == "browser":
+            return lambda course_code: self.check_course_result(course_code, state=state)
+        if name in ("script", "source"):
+            return lambda course_code: self.check_course_result(course_code, extraction=name, state=state)
+        if name == "fetch":
+            return lambda course_code: self.check_courses_fetch([course_code], state=state)[sanitize_course_code(course_code)]
+        raise ValueError(f"Unknown scraping engine '{name}'")
+    
+    def has_search_session(self) -> bool:
+        """True if the browser is on an authenticated Banner page with a CSRF token."""
+        try:
+            return bool(self.driver.execute_script(HAS_SEARCH_SESSION_SCRIPT))
+        except Exception:
+            return False
+    
+    def check_courses_fetch(self, course_codes: List[str],
+                            state: Optional[EngineState] = None) -> Dict[str, CourseResult]:
+        """
+        Check several courses by calling Banner's class search endpoint with fetch()
+        from inside the logged-in page (browser cookies and CSRF token, no navigation).
+        The UI login and term selection only run when there is no usable session.
+        Courses may be in different terms; the term is a request parameter, so there is
+        one script call per term and no term switching. Results are keyed by watch key.
+        """
+        state = state or self.primary
+        by_term = {}
+        for key in course_codes:
+            term, code = split_watch_key(key)
+            by_term.setdefault(term, [])
+            if code not in by_term[term]:
+                by_term[term].append(code)
+        
+        results = {}
+        for term, codes in by_term.items():
+            for code in codes:
+                results[watch_key(term, code)] = CourseResult(course_code=code, term=term)
             try:
-                # Wait a moment for page to load after login
-                time.sleep(3)
+                if self.fetch_session_stale or not self.has_search_session():
+                    logging.info("No Banner search session, logging in through the UI first")
+                    self.run_stage("login", self.open_search_page, state=state)
+                    self.run_stage("term", self.select_term_if_needed, term, state=state)
+                    self.fetch_session_stale = False
                 
-                logging.info(f"After login - Current URL: {self.driver.current_url}")
-                logging.info(f"After login - Page title: {self.driver.title}")
+                payload = self.run_stage("search", self.fetch_search_results, codes, term, state=state)
+            except (CircuitOpenError, StageError) as e:
+                logging.warning("Fetch check failed for %s: %s", ", ".join(codes), e)
+                for code in codes:
+                    results[watch_key(term, code)].error = str(e)
+                continue
+            
+            for code in codes:
+                result = results[watch_key(term, code)]
+                entry = payload["results"].get(code) or {"error": "no response"}
+                if "error" in entry:
+                    logging.error("Error checking course %s: %s", code, entry["error"])
+                    result.error = entry["error"]
+                    if entry["error"].startswith("session expired"):
+                        # Redo the UI login before the next batch
+                        self.fetch_session_stale = True
+                else:
+                    if len(entry["rows"]) < entry["total"]:
+                        logging.warning("Course %s: only %s of %s results fetched (RESULTS_MAX_PAGES=%s)",
+                                        code, len(entry["rows"]), entry["total"], RESULTS_MAX_PAGES)
+                    logging.debug("Course %s: %s results in %s pages", code, len(entry["rows"]), entry["pages"])
+                    self.parse_rows_if_changed(entry["rows"], code, result, state)
+        return results
+    
+    def fetch_search_results(self, codes: List[str], term: str = "") -> dict:
+        """Run the in-page fetch script for a batch of course codes in one term."""
+        self.driver.set_script_timeout(FETCH_TIMEOUT_SEC)
+        payload = self.driver.execute_async_script(
+            FETCH_SEARCH_SCRIPT, codes, self.term_codes.get(term) or "", self.term_label(term),
+            FETCH_PAGE_SIZE, FETCH_DELAY_MS, RESULTS_MAX_PAGES
+        )
+        if payload.get("error"):
+            raise RuntimeError(payload["error"])
+        
+        # Remember the resolved term code so later batches skip the lookup
+        self.term_codes[term] = payload.get("term") or self.term_codes.get(term)
+        logging.debug("Fetched %s courses in-page (term %s)", len(codes), self.term_codes[term])
+        return payload
+    
+    def term_label(self, term: str) -> str:
+        """Text typed into the term search for a watched term ("FALL2025" -> "fall 2025")."""
+        if not term:
+            return DEFAULT_TERM
+        return re.sub(r"(?<=\D)(?=\d)", " ", term).lower()
+    
+    def return_to_search(self, term: str) -> bool:
+        """
+        If the browser session already has this term selected, reload the class search
+        page directly (Banner keeps the term server-side) instead of going through
+        BASE_URL and the term selection page again.
+        """
+        if self.active_term != term or not self.has_search_session():
+            return False
+        try:
+            base = self.driver.current_url.split("/ssb/")[0]
+            self.driver.get(f"{base}/ssb/classSearch/classSearch")
+            if self.is_login_page() or not self.has_search_session():
+                self.active_term = None
+                return False
+            logging.info("Reusing the %s search session", self.term_label(term))
+            return True
+        except Exception as e:
+            logging.debug("Could not return to the search page: %s", e)
+            return False
+    
+    def breaker_stats(self) -> dict:
+        """Return the state of each of the primary engine's stage circuit breakers."""
+        return {stage: breaker.stats() for stage, breaker in self.primary.breakers.items()}
+    
+    def open_search_page(self) -> bool:
+        """Navigate to the registration site and log in if the SSO page appears."""
+        # Navigate to base URL
+        self.driver.get(BASE_URL)
+        
+        # IMMEDIATELY handle login since it always appears first
+        logging.info("Checking for login page immediately after navigation...")
+        time.sleep(2)  # Wait for page to load
+        
+        if not self.login_if_needed():
+            logging.error("Login failed, cannot proceed")
+            return False
+        return True
+    
+    def select_term_if_needed(self, term: str = "") -> bool:
+        """
+        Select the term if we're on the term selection page.
+        Returns False if the term page was shown but the term could not be selected,
+        or if checking the page failed.
+        """
+        label = self.term_label(term)
+        self.active_term = None
+        try:
+            # Wait a moment for page to load after login
+            time.sleep(3)
+            
+            logging.info("After login - Current URL: %s", self.driver.current_url)
+            logging.info("After login - Page title: %s", self.driver.title)
+            
+            # Check if we're at term selection page (one script call instead of
+            # serializing the whole page)
+            page_state = self.page_state()
+            is_term_page = page_state["is_term_page"]
+            has_select_dropdown = page_state["has_select"]
+            
+            logging.info("Term page indicators found: %s", is_term_page)
+            logging.info("Select dropdown found: %s", has_select_dropdown)
+            
+            if is_term_page or has_select_dropdown:
+                logging.info("Found term selection page")
                 
-                # Check if we're at term selection page
-                page_text = self.driver.page_source.lower()
-                term_indicators = [
-                    "terms open for registration"
+                # Handle Select2 dropdown (detected from HTML)
+                select2_selectors = [
+                    "#s2id_txt_term .select2-choice",  # Specific Select2 term dropdown
+                    ".select2-container .select2-choice",  # Generic Select2 dropdown
+                    ".term-combo2 .select2-choice",  # Term-specific Select2
+                    ".select2-choice"  # Any Select2 dropdown
                 ]
                 
-                is_term_page = any(indicator in page_text for indicator in term_indicators)
-                has_select_dropdown = len(self.driver.find_elements(By.CSS_SELECTOR, "select")) > 0
-                
-                logging.info(f"Term page indicators found: {is_term_page}")
-                logging.info(f"Select dropdown found: {has_select_dropdown}")
+                dropdown_clicked = False
+                for selector in select2_selectors:
+                    try:
+                        dropdown_trigger = self.driver.find_element(By.CSS_SELECTOR, selector)
+                        if dropdown_trigger.is_displayed():
+                            logging.info("Found Select2 dropdown with selector: %s", selector)
+                            
+                            # Click to open the dropdown
+                            dropdown_trigger.click()
+                            logging.info("SUCCESS: Clicked Select2 dropdown to open it")
+                            dropdown_clicked = True
+                            
+                            # Wait for dropdown options to appear
+                            time.sleep(1)
+                            break
+                    except Exception as e:
+                        logging.debug("Select2 selector %s failed: %s", selector, e)
+                        continue
                 
-                if is_term_page or has_select_dropdown:
-                    logging.info("Found term selection page")
+                if dropdown_clicked:
+                    # NEW STRATEGY: Type the term name and press Enter to select
+                    logging.info("NEW STRATEGY: Typing '%s' and pressing Enter...", label)
                     
-                    # Handle Select2 dropdown (detected from HTML)
-                    select2_selectors = [
-                        "#s2id_txt_term .select2-choice",  # Specific Select2 term dropdown
-                        ".select2-container .select2-choice",  # Generic Select2 dropdown
-                        ".term-combo2 .select2-choice",  # Term-specific Select2
-                        ".select2-choice"  # Any Select2 dropdown
-                    ]
+                    option_selected = False
                     
-                    dropdown_clicked = False
-                    for selector in select2_selectors:
-                        try:
-                            dropdown_trigger = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            if dropdown_trigger.is_displayed():
-                                logging.info(f"Found Select2 dropdown with selector: {selector}")
-                                
-                                # Click to open the dropdown
-                                dropdown_trigger.click()
-                                logging.info("SUCCESS: Clicked Select2 dropdown to open it")
-                                dropdown_clicked = True
-                                
-                                # Wait for dropdown options to appear
-                                time.sleep(1)
-                                break
-                        except Exception as e:
-                            logging.debug(f"Select2 selector {selector} failed: {e}")
-                            continue
-                    
-                    if dropdown_clicked:
-                        # NEW STRATEGY: Type "winter" and press Enter to select
-                        logging.info("NEW STRATEGY: Typing 'winter' and pressing Enter...")
+                    # Method 1: Find Select2 search input field and type
+                    try:
+                        search_selectors = [
+                            ".select2-search input",
+                            ".select2-input", 
+                            "#s2id_autogen1",  # From your HTML
+                            ".select2-focusser",
+                            "input[class*='select2']",
+                            ".select2-container input"
+                        ]
                         
-                        option_selected = False
+                        search_input = None
+                        for selector in search_selectors:
+                            try:
+                                search_input = self.driver.find_element(By.CSS_SELECTOR, selector)
+                                if search_input.is_displayed():
+                                    logging.info("Found Select2 search input with selector: %s", selector)
+                                    break
+                            except:
+                                continue
                         
-                        # Method 1: Find Select2 search input field and type
+                        if search_input:
+                            # Clear and type the term name
+                            search_input.clear()
+                            search_input.send_keys(label)
+                            logging.info("SUCCESS: Typed '%s' in search field", label)
+                            
+                            # Wait for filter to apply
+                            time.sleep(1)
+                            
+                            # Press Enter to select the filtered option
+                            from selenium.webdriver.common.keys import Keys
+                            search_input.send_keys(Keys.RETURN)
+                            logging.info("SUCCESS: Pressed ENTER to select filtered option")
+                            
+                            option_selected = True
+                            
+                        else:
+                            logging.info("No search input found, trying alternative method...")
+                            
+                    except Exception as e:
+                        logging.debug("Type + Enter method failed: %s", e)
+                    
+                    # Method 2: If no search input, try typing directly in the dropdown area
+                    if not option_selected:
                         try:
-                            search_selectors = [
-                                ".select2-search input",
-                                ".select2-input", 
-                                "#s2id_autogen1",  # From your HTML
-                                ".select2-focusser",
-                                "input[class*='select2']",
-                                ".select2-container input"
-                            ]
+                            # Click the dropdown area and type
+                            dropdown_area = self.driver.find_element(By.CSS_SELECTOR, ".select2-container, .select2-choice")
+                            dropdown_area.click()  # Ensure focus
                             
-                            search_input = None
-                            for selector in search_selectors:
-                                try:
-                                    search_input = self.driver.find_element(By.CSS_SELECTOR, selector)
-                                    if search_input.is_displayed():
-                                        logging.info(f"Found Select2 search input with selector: {selector}")
-                                        break
-                                except:
-                                    continue
+                            # Type the term name directly
+                            from selenium.webdriver.common.keys import Keys
+                            dropdown_area.send_keys(label)
+                            logging.info("SUCCESS: Typed '%s' directly in dropdown area", label)
+                            
+                            time.sleep(1)
+                            
+                            # Press Enter
+                            dropdown_area.send_keys(Keys.RETURN)
+                            logging.info("SUCCESS: Pressed ENTER to select")
+                            
+                            option_selected = True
                             
-                            if search_input:
-                                # Clear and type "winter"
-                                search_input.clear()
-                                search_input.send_keys("winter")
-                                logging.info("SUCCESS: Typed 'winter' in search field")
-                                
-                                # Wait for filter to apply
-                                time.sleep(1)
-                                
-                                # Press Enter to select the filtered option
-                                from selenium.webdriver.common.keys import Keys
-                                search_input.send_keys(Keys.RETURN)
-                                logging.info("SUCCESS: Pressed ENTER to select filtered option")
-                                
-                                option_selected = True
-                                
-                            else:
-                                logging.info("No search input found, trying alternative method...")
-                                
                         except Exception as e:
-                            logging.debug(f"Type + Enter method failed: {e}")
-                        
-                        # Method 2: If no search input, try typing directly in the dropdown area
-                        if not option_selected:
-                            try:
-                                # Click the dropdown area and type
-                                dropdown_area = self.driver.find_element(By.CSS_SELECTOR, ".select2-container, .select2-choice")
-                                dropdown_area.click()  # Ensure focus
-                                
-                                # Type "winter" directly
-                                from selenium.webdriver.common.keys import Keys
-                                dropdown_area.send_keys("winter")
-                                logging.info("SUCCESS: Typed 'winter' directly in dropdown area")
-                                
-                                time.sleep(1)
-                                
-                                # Press Enter
-                                dropdown_area.send_keys(Keys.RETURN)
-                                logging.info("SUCCESS: Pressed ENTER to select")
-                                
-                                option_selected = True
+                            logging.debug("Direct typing method failed: %s", e)
+                    
+                    # Method 3: JavaScript typing as final fallback
+                    if not option_selected:
+                        try:
+                            js_script = """
+                            // Find the dropdown container
+                            var container = document.querySelector('.select2-container');
+                            if (container) {
+                                // Simulate typing the term name
+                                var event = new Event('input', { bubbles: true });
+                                var keyEvent = new KeyboardEvent('keydown', { key: 'Enter', bubbles: true });
                                 
-                            except Exception as e:
-                                logging.debug(f"Direct typing method failed: {e}")
-                        
-                        # Method 3: JavaScript typing as final fallback
-                        if not option_selected:
-                            try:
-                                js_script = """
-                                // Find the dropdown container
-                                var container = document.querySelector('.select2-container');
-                                if (container) {
-                                    // Simulate typing 'winter'
-                                    var event = new Event('input', { bubbles: true });
-                                    var keyEvent = new KeyboardEvent('keydown', { key: 'Enter', bubbles: true });
-                                    
-                                    // Try to find search input
-                                    var searchInput = container.querySelector('input');
-                                    if (searchInput) {
-                                        searchInput.value = 'winter';
-                                        searchInput.dispatchEvent(event);
-                                        setTimeout(function() {
-                                            searchInput.dispatchEvent(keyEvent);
-                                        }, 500);
-                                        return 'Success: Typed winter and pressed Enter';
-                                    }
+                                // Try to find search input
+                                var searchInput = container.querySelector('input');
+                                if (searchInput) {
+                                    searchInput.value = arguments[0];
+                                    searchInput.dispatchEvent(event);
+                                    setTimeout(function() {
+                                        searchInput.dispatchEvent(keyEvent);
+                                    }, 500);
+                                    return 'Success: Typed ' + arguments[0] + ' and pressed Enter';
                                 }
-                                return 'Failed: Could not find search input';
-                                """
-                                result = self.driver.execute_script(js_script)
-                                logging.info(f"JavaScript typing result: {result}")
-                                
-                                if "Success" in result:
-                                    option_selected = True
-                                    logging.info("SUCCESS: Successfully typed 'winter' + Enter with JavaScript")
-                                    time.sleep(2)  # Wait for selection
-                                
-                            except Exception as e:
-                                logging.debug(f"JavaScript typing failed: {e}")
-                        
-                        if not option_selected:
-                            # Try to find all available options for debugging
-                            try:
-                                available_options = self.driver.find_elements(By.CSS_SELECTOR, ".select2-result, .select2-results li")
-                                option_texts = [opt.text.strip() for opt in available_options if opt.text.strip()]
-                                logging.error(f"Could not find Winter 2026. Available options: {option_texts}")
-                            except:
-                                logging.error("Could not find Winter 2026 option and failed to get available options")
-                            return 0
-                        
-                        # Wait a moment for selection to register
-                        time.sleep(2)
-                        
-                        # Click Continue button (using specific button from HTML)
-                        continue_selectors = [
-                            "#term-go",  # Specific ID from user's HTML
-                            "button[id='term-go']",  # Button with specific ID
-                            "button.form-button",  # Button with form-button class
-                            "button[data-endpoint*='term/search']",  # Button with term/search endpoint
-                            "input[value='Continue']",
-                            "input[value='CONTINUE']", 
-                            "button[type='submit']",
-                            "input[type='submit']",
-                            "button:contains('Continue')",
-                            ".btn:contains('Continue')"
-                        ]
-                        
-                        continue_clicked = False
-                        for selector in continue_selectors:
-                            try:
-                                continue_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                                if continue_button.is_displayed() and continue_button.is_enabled():
-                                    continue_button.click()
-                                    logging.info(f"Clicked Continue button with selector: {selector}")
-                                    continue_clicked = True
-                                    break
-                            except Exception as e:
-                                logging.debug(f"Continue selector {selector} failed: {e}")
-                                continue
-                        
-                        if not continue_clicked:
-                            logging.error("Could not find or click Continue button")
-                            return 0
-                        
-                        logging.info("Selected Winter 2026 term and clicked Continue")
-                    else:
-                        logging.error("Could not find or click Select2 term dropdown")
-                        return 0
-                        
+                            }
+                            return 'Failed: Could not find search input';
+                            """
+                            result = self.driver.execute_script(js_script, label)
+                            logging.info("JavaScript typing result: %s", result)
+                            
+                            if "Success" in result:
+                                option_selected = True
+                                logging.info("SUCCESS: Successfully typed '%s' + Enter with JavaScript", label)
+                                time.sleep(2)  # Wait for selection
+                            
+                        except Exception as e:
+                            logging.debug("JavaScript typing failed: %s", e)
+                    
+                    if not option_selected:
+                        # Try to find all available options for debugging
+                        try:
+                            available_options = self.driver.find_elements(By.CSS_SELECTOR, ".select2-result, .select2-results li")
+                            option_texts = [opt.text.strip() for opt in available_options if opt.text.strip()]
+                            logging.error("Could not find term '%s'. Available options: %s", label, option_texts)
+                        except:
+                            logging.error("Could not find term '%s' and failed to get available options", label)
+                        return False
+                    
+                    # Wait a moment for selection to register
+                    time.sleep(2)
+                    
+                    # Click Continue button (using specific button from HTML)
+                    continue_selectors = [
+                        "#term-go",  # Specific ID from user's HTML
+                        "button[id='term-go']",  # Button with specific ID
+                        "button.form-button",  # Button with form-button class
+                        "button[data-endpoint*='term/search']",  # Button with term/search endpoint
+                        "input[value='Continue']",
+                        "input[value='CONTINUE']", 
+                        "button[type='submit']",
+                        "input[type='submit']",
+                        "button:contains('Continue')",
+                        ".btn:contains('Continue')"
+                    ]
+                    
+                    continue_clicked = False
+                    for selector in continue_selectors:
+                        try:
+                            continue_button = self.driver.find_element(By.CSS_SELECTOR, selector)
+                            if continue_button.is_displayed() and continue_button.is_enabled():
+                                continue_button.click()
+                                logging.info("Clicked Continue button with selector: %s", selector)
+                                continue_clicked = True
+                                break
+                        except Exception as e:
+                            logging.debug("Continue selector %s failed: %s", selector, e)
+                            continue
+                    
+                    if not continue_clicked:
+                        logging.error("Could not find or click Continue button")
+                        return False
+                    
+                    logging.info("Selected term '%s' and clicked Continue", label)
+                    self.active_term = term
                 else:
-                    logging.info("Already at registration page, skipping term selection")
-                
-            except Exception as e:
-                logging.info(f"Term selection not needed or already completed: {e}")
+                    logging.error("Could not find or click Select2 term dropdown")
+                    return False
+                    
+            else:
+                logging.info("Already at registration page, skipping term selection")
+                # Only reuse this session later if the page shows which term it is for
+                if self.page_shows_term(label):
+                    self.active_term = term
+            
+        except Exception as e:
+            logging.error("Term selection failed: %s", e)
+            return False
+        
+        return True
+    
+    def page_shows_term(self, label: str) -> bool:
+        """True if the current page mentions the term (the class search page shows the selected term)."""
+        try:
+            return bool(self.driver.execute_script(PAGE_SHOWS_TERM_SCRIPT, " ".join(label.lower().split())))
+        except Exception:
+            return False
+    
+    def search_course(self, clean_code: str) -> bool:
+        """Search for a course on the Register for Classes page and wait for results."""
+        try:
+            # Wait for the course search interface to load
+            logging.info("Waiting for course search page to load...")
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input, select, .search"))
+            )
+            logging.info("Course search page loaded successfully")
+            
+            # Try multiple selectors for the course search field
+            search_field = None
+            selectors_to_try = [
+                "input[placeholder*='course']",
+                "input[name*='course']", 
+                "input[id*='course']",
+                "input[placeholder*='subject']",
+                "input[name*='subject']",
+                "input[id*='subject']",
+                "input[type='text']"
+            ]
+            
+            for selector in selectors_to_try:
+                try:
+                    search_field = self.driver.find_element(By.CSS_SELECTOR, selector)
+                    if search_field.is_displayed():
+                        logging.info("Found search field with selector: %s", selector)
+                        break
+                except:
+                    continue
+            
+            if not search_field:
+                logging.error("Could not find course search field")
+                return False
+            
+            # Clear and enter the course code
+            search_field.clear()
+            search_field.send_keys(clean_code)
+            logging.info("SUCCESS: Typed course code: %s", clean_code)
             
-            # Step 2: Wait for Register for Classes page and search for course
+            # NEW STRATEGY: Just press Enter immediately after typing
+            logging.info("NEW STRATEGY: Pressing ENTER to search for course...")
+            
+            # Wait a brief moment for typing to register
+            time.sleep(1)
+            
+            # Press Enter to submit search
+            from selenium.webdriver.common.keys import Keys
+            search_field.send_keys(Keys.RETURN)
+            logging.info("SUCCESS: Pressed ENTER to submit course search")
+            
+            # Wait a moment to see if Enter worked
+            time.sleep(2)
+            
+            logging.info("After Enter - URL: %s", self.driver.current_url)
+            
+            # Fallback: Try search button if Enter didn't seem to work
             try:
-                # Wait for the course search interface to load
-                logging.info("Waiting for course search page to load...")
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input, select, .search"))
-                )
-                logging.info("Course search page loaded successfully")
-                
-                # Try multiple selectors for the course search field
-                search_field = None
-                selectors_to_try = [
-                    "input[placeholder*='course']",
-                    "input[name*='course']", 
-                    "input[id*='course']",
-                    "input[placeholder*='subject']",
-                    "input[name*='subject']",
-                    "input[id*='subject']",
-                    "input[type='text']"
+                # Check if we still need to click a search button
+                search_buttons = [
+                    "input[value*='Search']",
+                    "button[type='submit']", 
+                    "input[type='submit']",
+                    "button[id*='search']",
+                    ".search-button",
+                    ".btn-search"
                 ]
                 
-                for selector in selectors_to_try:
+                button_clicked = False
+                for button_selector in search_buttons:
                     try:
-                        search_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if search_field.is_displayed():
-                            logging.info(f"Found search field with selector: {selector}")
+                        search_button = self.driver.find_element(By.CSS_SELECTOR, button_selector)
+                        if search_button.is_displayed() and search_button.is_enabled():
+                            search_button.click()
+                            logging.info("🔄 Fallback: Clicked search button: %s", button_selector)
+                            button_clicked = True
                             break
                     except:
                         continue
                 
-                if not search_field:
-                    logging.error("Could not find course search field")
-                    return 0
-                
-                # Clear and enter the course code
-                search_field.clear()
-                search_field.send_keys(clean_code)
-                logging.info(f"SUCCESS: Typed course code: {clean_code}")
-                
-                # NEW STRATEGY: Just press Enter immediately after typing
-                logging.info("NEW STRATEGY: Pressing ENTER to search for course...")
-                
-                # Wait a brief moment for typing to register
-                time.sleep(1)
-                
-                # Press Enter to submit search
-                from selenium.webdriver.common.keys import Keys
-                search_field.send_keys(Keys.RETURN)
-                logging.info("SUCCESS: Pressed ENTER to submit course search")
-                
-                # Wait a moment to see if Enter worked
-                time.sleep(2)
-                
-                # Check if search was submitted by looking for results or changes
-                current_url = self.driver.current_url
-                page_source_length = len(self.driver.page_source)
-                
-                logging.info(f"After Enter - URL: {current_url}")
-                logging.info(f"After Enter - Page length: {page_source_length}")
-                
-                # Fallback: Try search button if Enter didn't seem to work
-                try:
-                    # Check if we still need to click a search button
-                    search_buttons = [
-                        "input[value*='Search']",
-                        "button[type='submit']", 
-                        "input[type='submit']",
-                        "button[id*='search']",
-                        ".search-button",
-                        ".btn-search"
-                    ]
+                if not button_clicked:
+                    logging.info("SUCCESS: Enter key worked - no search button needed")
                     
-                    button_clicked = False
-                    for button_selector in search_buttons:
-                        try:
-                            search_button = self.driver.find_element(By.CSS_SELECTOR, button_selector)
-                            if search_button.is_displayed() and search_button.is_enabled():
-                                search_button.click()
-                                logging.info(f"🔄 Fallback: Clicked search button: {button_selector}")
-                                button_clicked = True
-                                break
-                        except:
-                            continue
-                    
-                    if not button_clicked:
-                        logging.info("SUCCESS: Enter key worked - no search button needed")
-                        
-                except Exception as e:
-                    logging.debug(f"Search button fallback failed: {e}")
-                
-                logging.info("Submitted course search")
-                
             except Exception as e:
-                logging.error(f"Failed to search for course: {e}")
-                return 0
+                logging.debug("Search button fallback failed: %s", e)
             
-            # Step 3: Parse results table
+            logging.info("Submitted course search")
+            
+            # Wait for results table
+            logging.info("Waiting for search results to load...")
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table, .search-results"))
+            )
+            return True
+            
+        except Exception as e:
+            logging.error("Failed to search for course: %s", e)
+            return False
+    
+    def page_state(self) -> dict:
+        """Return term-page flags for the current page in a single script call."""
+        if EXTRACTION_MODE == "source":
+            page_text = self.driver.page_source.lower()
+            return {
+                "is_term_page": any(indicator in page_text for indicator in TERM_PAGE_INDICATORS),
+                "has_select": "<select" in page_text,
+            }
+        
+        state = self.driver.execute_script(PAGE_STATE_SCRIPT, TERM_PAGE_INDICATORS)
+        return {
+            "is_term_page": bool(state.get("isTermPage")),
+            "has_select": bool(state.get("hasSelect")),
+        }
+    
+    def extract_rows(self, mode: Optional[str] = None) -> list:
+        """
+        Return the results-table rows as dicts keyed by data-property.
+        Runs one in-browser script that returns only the needed cells; falls back to
+        parsing the full page source if the script fails.
+        """
+        if (mode or EXTRACTION_MODE) != "source":
             try:
-                # Wait for results table
-                logging.info("Waiting for search results to load...")
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "table, .search-results"))
-                )
-                logging.info("Search results loaded, parsing course data...")
-                
-                # Get page source and parse
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                
-                # Find the results table
-                tables = soup.find_all('table')
-                logging.info(f"Found {len(tables)} tables on the page")
-                
-                # Track the maximum available seats across all matching sections
-                max_available_seats = 0
-                found_matching_sections = 0
-                
-                for table_idx, table in enumerate(tables):
-                    rows = table.find_all('tr')
-                    logging.info(f"Table {table_idx}: Found {len(rows)} rows")
-                    
-                    for row_idx, row in enumerate(rows):
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) < 5:  # Skip header or incomplete rows
-                            continue
-                        
-                        # Look for specific cells using data-property attributes
-                        subject_cell = row.find('td', {'data-property': 'subject'})
-                        course_number_cell = row.find('td', {'data-property': 'courseNumber'})
-                        schedule_type_cell = row.find('td', {'data-property': 'scheduleType'})
-                        status_cell = row.find('td', {'data-property': 'status'})
-                        
-                        if subject_cell and course_number_cell and schedule_type_cell and status_cell:
-                            subject = subject_cell.get_text(strip=True)
-                            course_number = course_number_cell.get_text(strip=True)
-                            schedule_type = schedule_type_cell.get_text(strip=True)
-                            
-                            # Extract status text more robustly - try title attribute first, then text content
-                            status_text = status_cell.get('title', '').strip()
-                            if not status_text:
-                                status_text = status_cell.get_text(strip=True)
-                            
-                            logging.info(f"DEBUG: Row {row_idx} - Subject: {subject}, Course: {course_number}, Type: {schedule_type}, Status: '{status_text}'")
-                            
-                            # Check if this matches our course, is CSCI subject, and is a lecture
-                            if course_number == clean_code and subject == 'CSCI' and schedule_type == 'Lecture':
-                                found_matching_sections += 1
-                                logging.info(f"DEBUG: MATCH #{found_matching_sections}! Found CSCI {clean_code} lecture with status: '{status_text}'")
-                                
-                                section_seats = 0  # Default to 0 seats for this section
-                                
-                                # Pattern 1: "X of Y seats remain/rem..." (case-insensitive, flexible spacing)
-                                seats_remaining_match = re.search(r'(\d+)\s*of\s*\d+\s*seats?\s*rem(?:ain)?', status_text, re.IGNORECASE)
-                                if seats_remaining_match:
-                                    section_seats = int(seats_remaining_match.group(1))
-                                    logging.info(f"PARSED: Section has {section_seats} seats remaining")
-                                
-                                # Pattern 1b: More flexible "X of Y" pattern (backup, flexible spacing)  
-                                elif re.search(r'(\d+)\s*of\s*(\d+)', status_text):
-                                    flexible_match = re.search(r'(\d+)\s*of\s*(\d+)', status_text)
-                                    section_seats = int(flexible_match.group(1))
-                                    total_seats = int(flexible_match.group(2))
-                                    logging.info(f"PARSED: Section has {section_seats} of {total_seats} seats available")
-                                
-                                # Pattern 2: "FULL: 0 of X" - just log it, don't return early
-                                elif 'FULL:' in status_text and '0 of' in status_text:
-                                    section_seats = 0
-                                    logging.info(f"PARSED: Section is full (0 seats)")
-                                
-                                # Pattern 3: Check for "OPEN" status
-                                elif 'OPEN' in status_text.upper():
-                                    # Try to extract number if available
-                                    open_match = re.search(r'(\d+)', status_text)
-                                    if open_match:
-                                        section_seats = int(open_match.group(1))
-                                        logging.info(f"PARSED: Section is open with {section_seats} seats")
-                                    else:
-                                        section_seats = 1  # At least 1 spot available
-                                        logging.info(f"PARSED: Section is open (assuming 1+ seats)")
-                                
-                                # Update maximum available seats
-                                if section_seats > max_available_seats:
-                                    max_available_seats = section_seats
-                                    logging.info(f"NEW MAX: Updated max available seats to {max_available_seats}")
+                rows = self.driver.execute_script(EXTRACT_ROWS_SCRIPT, ROW_PROPERTIES)
+                logging.debug("Extracted %s result rows in-browser", len(rows))
+                return rows
+            except Exception as e:
+                logging.warning("In-browser extraction failed, parsing page source instead: %s", e)
+        
+        return self.extract_rows_from_source()
+    
+    def iter_result_rows(self, mode: Optional[str] = None):
+        """
+        Yield result rows across every page of the results table.
+        Switches the pager to its largest page size first (unless there are no rows),
+        then yields each page's rows before loading the next.
+        Raises TimeoutException if a page doesn't load (the result would be incomplete).
+        """
+        first_row = self.first_result_row()
+        largest = first_row is not None and self.driver.execute_script(MAX_PAGE_SIZE_SCRIPT)
+        if largest:
+            logging.debug("Switching results to %s per page", largest)
+            try:
+                self.wait_for_page_change(first_row)
+            except TimeoutException:
+                # Not re-rendered (e.g. everything already fit on one page)
+                logging.debug("Results did not reload after the page size change")
+        
+        for page in range(1, RESULTS_MAX_PAGES + 1):
+            rows = self.extract_rows(mode)
+            logging.debug("Results page %s: %s rows", page, len(rows))
+            yield from rows
+            
+            first_row = self.first_result_row()
+            if first_row is None or not self.driver.execute_script(NEXT_PAGE_SCRIPT):
+                return
+            self.wait_for_page_change(first_row)
+        
+        logging.warning("Stopped after RESULTS_MAX_PAGES=%s result pages", RESULTS_MAX_PAGES)
+    
+    def first_result_row(self):
+        """
+        Return the first results row element (to detect when the page is replaced), or None.
+        Uses a script instead of find_elements, which would sit out the implicit wait
+        whenever there are no rows.
+        """
+        return self.driver.execute_script("return document.querySelector('table tbody tr');")
+    
+    def wait_for_page_change(self, old_row) -> None:
+        """Wait until the given results row is replaced and the new rows are present."""
+        if old_row is not None:
+            WebDriverWait(self.driver, 10).until(EC.staleness_of(old_row))
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+        )
+    
+    def extract_rows_from_source(self) -> list:
+        """Parse results-table rows out of the full page source with BeautifulSoup."""
+        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        rows = []
+        for table in soup.find_all('table'):
+            for tr in table.find_all('tr'):
+                if len(tr.find_all(['td', 'th'])) < 5:  # Skip header or incomplete rows
+                    continue
                 
-                # Final result
-                if found_matching_sections == 0:
-                    logging.info(f"Course {clean_code}: No CSCI lecture sections found")
-                    return 0
-                elif max_available_seats > 0:
-                    logging.info(f"SUCCESS: Course {clean_code}: {max_available_seats} seats available (checked {found_matching_sections} CSCI lecture sections)")
-                    return max_available_seats
-                else:
-                    logging.info(f"Course {clean_code}: Found {found_matching_sections} CSCI lecture sections, but all are full")
-                    return 0
+                row = {}
+                for prop in ROW_PROPERTIES:
+                    cell = tr.find('td', {'data-property': prop})
+                    if cell is None:
+                        continue
+                    # Status text: try title attribute first, then text content
+                    text = cell.get('title', '').strip() if prop == 'status' else ''
+                    row[prop] = text or cell.get_text(strip=True)
                 
-            except Exception as e:
-                logging.error(f"Failed to parse results: {e}")
-                return 0
+                if all(prop in row for prop in REQUIRED_ROW_PROPERTIES):
+                    rows.append(row)
+        
+        logging.debug("Extracted %s result rows from page source", len(rows))
+        return rows
+    
+    def parse_rows_if_changed(self, rows, clean_code: str, result: CourseResult,
+                              state: Optional[EngineState] = None) -> CourseResult:
+        """
+        Fingerprint the rows while matching them, one page at a time as the pages load,
+        and keep the matches only if the rows differ from the engine's last check of this
+        course. An unchanged result reuses the previous seats and sections and has
+        unchanged set, so callers can skip their own state updates too.
+        """
+        fingerprints = (state or self.primary).fingerprints
+        digest = hashlib.blake2b(digest_size=16)
+        
+        def fingerprinted(rows):
+            for row in rows:
+                fingerprint_row(digest, row)
+                yield row
+        
+        sections = self.match_sections(fingerprinted(rows), clean_code)
+        previous = fingerprints.match(result.key, digest.digest())
+        if previous is not None:
+            result.seats = previous.seats
+            result.sections = previous.sections
+            result.unchanged = True
+            logging.debug("Course %s: results unchanged since last check", clean_code)
+            return result
+        
+        self.apply_sections(sections, clean_code, result)
+        fingerprints.record(result.key, digest.digest(), result)
+        return result
+    
+    def fingerprint_stats(self) -> dict:
+        """Return the primary engine's unchanged (hit) and changed (miss) counters."""
+        return self.primary.fingerprints.stats()
+    
+    def clear_fingerprints(self, course_code: Optional[str] = None) -> None:
+        """Forget one course's primary fingerprint, or all of them, so the next check is fully evaluated."""
+        self.primary.fingerprints.forget(course_code)
+    
+    def parse_rows(self, rows: list, clean_code: str, result: CourseResult) -> CourseResult:
+        """Match extracted rows against the course and fill in seats and sections."""
+        return self.apply_sections(self.match_sections(rows, clean_code), clean_code, result)
+    
+    def match_sections(self, rows, clean_code: str) -> List[SectionResult]:
+        """Return the course's lecture sections among the extracted rows (any iterable)."""
+        log_rows = logging.getLogger().isEnabledFor(logging.DEBUG)
+        sections = []
+        
+        for row_idx, row in enumerate(rows):
+            subject = row['subject']
+            course_number = row['courseNumber']
+            schedule_type = row['scheduleType']
+            status_text = row['status']
             
-        except TimeoutException:
-            logging.error(f"Timeout while checking course {course_code}")
-            return 0
-        except Exception as e:
-            logging.error(f"Error checking course {course_code}: {e}")
-            return 0
+            # Per-row detail is sampled so large listings don't flood the log
+            if log_rows and row_idx % LOG_ROW_SAMPLE_EVERY == 0:
+                logging.debug("Row %s - Subject: %s, Course: %s, Type: %s, Status: '%s'", row_idx, subject, course_number, schedule_type, status_text)
+            
+            # Check if this matches our course, is CSCI subject, and is a lecture
+            if course_number == clean_code and subject == 'CSCI' and schedule_type == 'Lecture':
+                logging.debug("MATCH #%s! Found CSCI %s lecture with status: '%s'", len(sections) + 1, clean_code, status_text)
+                sections.append(SectionResult(
+                    subject=subject,
+                    course_number=course_number,
+                    schedule_type=schedule_type,
+                    status=status_text,
+                    seats=parse_seats(status_text),
+                    crn=row.get('courseReferenceNumber', ''),
+                    section=row.get('sequenceNumber', ''),
+                ))
+        return sections
+    
+    def apply_sections(self, sections: List[SectionResult], clean_code: str, result: CourseResult) -> CourseResult:
+        """Fill in the result from the matched sections: seats is the most open in any section."""
+        result.sections.extend(sections)
+        found_matching_sections = len(sections)
+        max_available_seats = max((section.seats for section in sections), default=0)
+        
+        # Final result
+        if found_matching_sections == 0:
+            logging.info("Course %s: No CSCI lecture sections found", clean_code,
+                         extra={"course": clean_code, "seats": 0, "sections": 0})
+        elif max_available_seats > 0:
+            logging.info("SUCCESS: Course %s: %s seats available (checked %s CSCI lecture sections)", clean_code, max_available_seats, found_matching_sections,
+                         extra={"course": clean_code, "seats": max_available_seats, "sections": found_matching_sections})
+            result.seats = max_available_seats
+        else:
+            logging.info("Course %s: Found %s CSCI lecture sections, but all are full", clean_code, found_matching_sections,
+                         extra={"course": clean_code, "seats": 0, "sections": found_matching_sections})
+        return result
     
     def close(self) -> None:
-        """Clean up WebDriver."""
-        if self.driver:
-            try:
-                self.driver.quit()
-                logging.info("WebDriver closed successfully")
-            except Exception as e:
-                logging.error(f"Error closing WebDriver: {e}") 
\ No newline at end of file
+        """Save the session (unless the browser is logged out) and clean up WebDriver. Safe to call twice."""
+        if not self.driver:
+            return
+        try:
+            logged_in = not self.is_login_page()
+        except Exception:
+            logged_in = False  # Browser already gone
+        if logged_in:
+            self.save_session()
+        else:
+            # Keep the saved session instead of overwriting it with logged-out cookies
+            logging.info("Not saving the session: the browser is not logged in")
+        
+        try:
+            self.driver.quit()
+            logging.info("WebDriver closed successfully")
+        except Exception as e:
+            logging.error("Error closing WebDriver: %s", e)
+        self.driver = None
\ No newline at end of file
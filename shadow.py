@@ -0,0 +1,125 @@
+from collections import deque
+from typing import Callable, List, Optional
+import threading
+import logging
+import random
+import time
+from models import CourseResult
+
+class LatencyStats:
+    """Rolling latency window for one engine."""
+
+    def __init__(self, window: int = 500):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self) -> dict:
+        """Return count, mean, p50 and p95 in seconds over the window."""
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p50": round(ordered[len(ordered) // 2], 3),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        }
+
+def compare_results(primary: CourseResult, shadow: CourseResult) -> List[str]:
+    """Return human-readable differences between two results for the same course."""
+    if primary.ok != shadow.ok:
+        return [f"error: primary={primary.error!r} shadow={shadow.error!r}"]
+    if not primary.ok:
+        return []
+
+    differences = []
+    if primary.seats != shadow.seats:
+        differences.append(f"seats: primary={primary.seats} shadow={shadow.seats}")
+
+    # Compare sections by CRN where available, otherwise by position
+    def by_key(result):
+        return {s.crn or str(i): s.seats for i, s in enumerate(result.sections)}
+
+    primary_sections, shadow_sections = by_key(primary), by_key(shadow)
+    for key in sorted(set(primary_sections) | set(shadow_sections)):
+        if primary_sections.get(key) != shadow_sections.get(key):
+            differences.append(f"section {key}: primary={primary_sections.get(key)} shadow={shadow_sections.get(key)}")
+    return differences
+
+class ShadowVerifier:
+    """
+    Runs an alternative engine on a sampled fraction of checks and compares its
+    results with the primary engine. Shadow results are only recorded, never acted on.
+    """
+
+    def __init__(self, engine: Callable[[str], CourseResult], name: str,
+                 sample_rate: float = 0.1, sampler: Callable[[], float] = random.random):
+        self.engine = engine
+        self.name = name
+        self.sample_rate = sample_rate
+        self.sampler = sampler
+        self.primary_latency = LatencyStats()
+        self.shadow_latency = LatencyStats()
+        self.samples = 0
+        self.agreements = 0
+        self.disagreements = 0
+        self.shadow_errors = 0
+        self.recent_disagreements = deque(maxlen=20)
+        self.lock = threading.Lock()
+
+    def maybe_verify(self, primary: CourseResult, primary_seconds: float) -> Optional[List[str]]:
+        """
+        Run the shadow engine for this course if it is sampled.
+        Returns the list of differences (empty if they agree), or None if not sampled.
+        """
+        if self.sampler() >= self.sample_rate:
+            return None
+
+        start = time.monotonic()
+        try:
+            shadow = self.engine(primary.key)
+        except Exception as e:
+            shadow = CourseResult(course_code=primary.course_code, term=primary.term, error=str(e))
+        shadow_seconds = time.monotonic() - start
+
+        differences = compare_results(primary, shadow)
+
+        with self.lock:
+            self.samples += 1
+            self.primary_latency.add(primary_seconds)
+            self.shadow_latency.add(shadow_seconds)
+            if not shadow.ok:
+                self.shadow_errors += 1
+            if differences:
+                self.disagreements += 1
+                self.recent_disagreements.append({
+                    "course": primary.key,
+                    "at": shadow.checked_at,
+                    "differences": differences,
+                })
+            else:
+                self.agreements += 1
+
+        if differences:
+            logging.warning(f"Shadow engine {self.name} disagrees on {primary.key}: {'; '.join(differences)}")
+        else:
+            logging.debug("Shadow engine %s agrees on %s (%.2fs primary vs %.2fs shadow)",
+                          self.name, primary.key, primary_seconds, shadow_seconds)
+        return differences
+
+    def stats(self) -> dict:
+        """Return sample, agreement and latency statistics."""
+        with self.lock:
+            return {
+                "engine": self.name,
+                "sample_rate": self.sample_rate,
+                "samples": self.samples,
+                "agreements": self.agreements,
+                "disagreements": self.disagreements,
+                "shadow_errors": self.shadow_errors,
+                "primary_latency": self.primary_latency.summary(),
+                "shadow_latency": self.shadow_latency.summary(),
+                "recent_disagreements": list(self.recent_disagreements),
+            }
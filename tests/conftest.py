@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings config.py requires, for tests that import it
+os.environ.setdefault("INTERVAL_MIN", "5")
+os.environ.setdefault("HEADLESS", "true")
+
+class FakeClock:
+    """Monotonic clock that only moves when advanced."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,71 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from api import SnapshotStore, AvailabilityAPI
+from models import CourseResult, SectionResult
+
+def result(code, seats, term="", status="Open", **kwargs):
+    section = SectionResult("CSCI", code, "Lecture", status, seats=seats, crn="1")
+    return CourseResult(course_code=code, term=term, seats=seats, sections=[section], **kwargs)
+
+def test_update_only_counts_real_changes():
+    store = SnapshotStore()
+    assert store.update(result("CSCI2000U", 0))
+    assert not store.update(result("CSCI2000U", 0))
+    assert not store.update(result("CSCI2000U", 0, unchanged=True))
+    assert not store.update(CourseResult(course_code="CSCI2000U", error="timeout"))
+    assert store.update(result("CSCI2000U", 2))
+    assert store.version == 2
+    assert store.get("csci2000u")["seats"] == 2
+
+def test_changes_since_lists_each_changed_course_once():
+    store = SnapshotStore()
+    store.update(result("A", 0))
+    store.update(result("B", 0))
+    store.update(result("A", 1))
+    store.update(result("A", 2))
+
+    changes = store.changes_since(1, timeout=0)
+    assert changes["version"] == 4
+    assert [c["course"] for c in changes["changes"]] == ["B", "A"]
+    assert changes["changes"][1]["seats"] == 2
+    assert store.changes_since(4, timeout=0)["changes"] == []
+
+def test_removed_courses_stop_being_served():
+    store = SnapshotStore()
+    store.update(result("A", 1, term="FALL2025"))
+    store.update(result("B", 1))
+
+    assert store.remove("fall2025:a")
+    assert not store.remove("FALL2025:A")
+    assert store.get("FALL2025:A") is None
+    assert [c["course"] for c in store.all()["courses"]] == ["B"]
+    assert store.changes_since(0, timeout=0)["removed"] == ["FALL2025:A"]
+
+@pytest.fixture
+def api():
+    store = SnapshotStore()
+    api = AvailabilityAPI(store, lambda: {"cycle": {}}, port=0)
+    api.start()
+    api.base = f"http://127.0.0.1:{api.server.server_address[1]}"
+    yield api
+    api.stop()
+
+def get_json(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+def test_course_endpoint_accepts_encoded_term_keys(api):
+    api.store.update(result("CSCI2000U", 3, term="FALL2025"))
+
+    status, snapshot = get_json(f"{api.base}/courses/FALL2025%3ACSCI2000U")
+    assert status == 200 and snapshot["seats"] == 3
+    assert get_json(f"{api.base}/courses/CSCI2000U")[0] == 404
+
+def test_changes_endpoint_validates_parameters(api):
+    assert get_json(f"{api.base}/changes?since=abc")[0] == 400
+    assert get_json(f"{api.base}/changes?since=0&timeout=0")[1] == {"version": 0, "changes": [], "removed": []}
@@ -0,0 +1,61 @@
+from breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("login", failure_threshold=2, backoff=60, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 60
+    assert breaker.stats()["rejected"] == 1
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("login", failure_threshold=2, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("search", failure_threshold=1, backoff=60, clock=clock)
+    breaker.record_failure()
+
+    clock.advance(59)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Probe already in flight
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+    assert breaker.stats()["backoff_sec"] == 60
+
+def test_failed_probes_double_the_backoff_up_to_the_max(clock):
+    breaker = CircuitBreaker("term", failure_threshold=1, backoff=60, max_backoff=200, clock=clock)
+    breaker.record_failure()
+
+    for expected in (120, 200, 200):
+        clock.advance(breaker.retry_in())
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == expected
+
+    assert breaker.stats()["opened"] == 4
+
+def test_backoff_resets_after_recovery(clock):
+    breaker = CircuitBreaker("term", failure_threshold=1, backoff=60, clock=clock)
+    breaker.record_failure()
+    clock.advance(60)
+    breaker.allow()
+    breaker.record_failure()
+    clock.advance(120)
+    breaker.allow()
+    breaker.record_success()
+
+    breaker.record_failure()
+    assert breaker.retry_in() == 60
@@ -0,0 +1,155 @@
+import pytest
+import notifier
+from api import SnapshotStore
+from burst import BurstMonitor
+from models import CourseResult, SectionResult
+from notifier import NotificationBackend, NotificationService
+from utils import RateLimiter
+
+class RecordingBackend(NotificationBackend):
+    name = "recording"
+
+    def __init__(self, rate_per_min=None, timeout=10):
+        super().__init__(rate_per_min, timeout)
+        self.messages = []
+
+    def deliver(self, recipient, message, course_code, spots):
+        self.messages.append(message)
+        return "ok"
+
+class FakeSession:
+    """Burst browser session whose engine returns queued seat counts."""
+
+    def __init__(self):
+        self.seats = []
+
+    def start_session(self):
+        return True
+
+    def get_engine(self, name):
+        return lambda key: CourseResult(course_code=key, seats=self.seats.pop(0))
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def monitor(clock, monkeypatch):
+    """BurstMonitor with a fake session and a NotificationService that records messages."""
+    monkeypatch.setattr(notifier, "load_subscribers",
+                        lambda: [{"name": "me", "courses": [], "channels": [{"backend": "recording", "to": "me"}]}])
+    monkeypatch.setattr(notifier, "BACKENDS", {"recording": RecordingBackend})
+    service = NotificationService()
+    session = FakeSession()
+    forgotten = []
+    monitor = BurstMonitor(lambda: session, "browser", service, SnapshotStore(),
+                           RateLimiter(600, clock=clock), window=60, near_seats=1,
+                           forget=forgotten.append, clock=clock)
+    monitor.session, monitor.forgotten = session, forgotten
+    monitor.messages = service.backends["recording"].messages
+    yield monitor
+    service.close()
+
+def regular_check(monitor, seats, sections=None):
+    """Run what the regular cycle does for a result: notify if open, then observe."""
+    result = CourseResult(course_code="CSCI2000U", seats=seats, sections=sections or [])
+    if result.available:
+        monitor.notifier.notify(result.key, seats)
+    return monitor.observe(result)
+
+def poll(monitor, clock, seats):
+    monitor.session.seats.append(seats)
+    clock.advance(5)
+    monitor.poll()
+
+def test_opening_starts_a_burst_that_confirms_without_renotifying(monitor, clock):
+    assert regular_check(monitor, 0) is None  # First result has nothing to compare with
+    assert regular_check(monitor, 3) == "just opened"
+    assert monitor.is_active("csci2000u")
+
+    poll(monitor, clock, 2)  # A different seat count is still the same opening
+    assert monitor.messages == ["CSCI2000U available now! 3 seats"]
+    assert monitor.stats()["follow_ups"] == 0
+
+def test_first_poll_announces_an_opening_the_regular_check_failed_to_send(monitor, clock):
+    regular_check(monitor, 0)
+    monitor.observe(CourseResult(course_code="CSCI2000U", seats=3))  # Notification not sent
+
+    poll(monitor, clock, 3)
+    assert monitor.messages == ["CSCI2000U available now! 3 seats"]
+
+def test_close_clears_dedup_and_fingerprint(monitor, clock):
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    poll(monitor, clock, 3)
+    poll(monitor, clock, 0)
+
+    assert monitor.messages[-1] == "CSCI2000U is full again (seats lasted 10s)"
+    assert not monitor.notifier.has_notified("CSCI2000U")
+    assert monitor.forgotten == ["CSCI2000U"]
+
+def test_reopen_during_burst_is_announced(monitor, clock):
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    for seats in (3, 0, 3):
+        poll(monitor, clock, seats)
+
+    assert monitor.messages[-1] == "CSCI2000U open again! 3 seats"
+    assert monitor.stats()["follow_ups"] == 2
+
+def test_closed_by_first_poll_is_reported(monitor, clock):
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    poll(monitor, clock, 0)
+
+    assert monitor.messages[-1] == "CSCI2000U is full again (seats lasted 5s)"
+    assert monitor.forgotten == ["CSCI2000U"]
+
+def test_reopen_after_the_burst_ends_is_announced(monitor, clock):
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    poll(monitor, clock, 3)
+    poll(monitor, clock, 0)
+    clock.advance(60)
+    monitor.poll()
+    assert not monitor.is_active("CSCI2000U")
+
+    # Same seat count as the first opening: only announced because the close cleared it
+    assert regular_check(monitor, 3) == "just opened"
+    assert monitor.messages.count("CSCI2000U available now! 3 seats") == 2
+
+def test_opening_while_bursting_a_full_course_is_announced(monitor, clock):
+    regular_check(monitor, 0)
+    waitlisted = [SectionResult("CSCI", "2000U", "Lecture", "Waitlist")]
+    assert regular_check(monitor, 0, waitlisted) == "section status changed while full"
+    poll(monitor, clock, 2)
+
+    assert monitor.messages == ["CSCI2000U available now! 2 seats"]
+
+def test_near_seats_needs_a_drop(monitor):
+    regular_check(monitor, 1)
+    assert regular_check(monitor, 1) is None
+    regular_check(monitor, 3)
+    assert regular_check(monitor, 1) == "down to 1 seats"
+
+def test_polls_wait_for_the_scrape_budget(monitor, clock):
+    monitor.budget = RateLimiter(6, burst=1, clock=clock)
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    monitor.budget.try_acquire()  # Used up by the regular cycle
+
+    monitor.session.seats.append(3)
+    monitor.poll()
+    assert monitor.stats()["budget_skips"] == 1 and monitor.polls == 0
+    clock.advance(10)
+    monitor.poll()
+    assert monitor.polls == 1
+
+def test_burst_ends_after_the_window(monitor, clock):
+    regular_check(monitor, 0)
+    regular_check(monitor, 3)
+    poll(monitor, clock, 3)
+    clock.advance(60)
+    monitor.poll()
+
+    assert not monitor.is_active("CSCI2000U")
+    assert monitor.stats()["active"] == {}
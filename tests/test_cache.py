@@ -0,0 +1,132 @@
+import threading
+from cache import ResultCache, FingerprintStore
+from models import CourseResult
+
+def counting_fetch(results=None):
+    """Return a fetch function that records the course codes it was called with."""
+    calls = []
+    def fetch(course_code):
+        calls.append(course_code)
+        return (results or {}).get(course_code) or CourseResult(course_code=course_code, seats=len(calls))
+    return fetch, calls
+
+def test_entries_expire_after_ttl(clock):
+    fetch, calls = counting_fetch()
+    cache = ResultCache(fetch, ttl=60, clock=clock)
+
+    first = cache.get("csci 2000u")
+    clock.advance(59)
+    assert cache.get("CSCI2000U") is first
+    clock.advance(1)
+    assert cache.peek("CSCI2000U") is None
+    assert cache.get("CSCI2000U") is not first
+    assert calls == ["CSCI2000U", "CSCI2000U"]
+    assert cache.stats()["hits"] == 1
+
+def test_ttl_override_and_zero_ttl(clock):
+    fetch, calls = counting_fetch()
+    cache = ResultCache(fetch, ttl=60, ttl_overrides={"math1010u": 0}, clock=clock)
+
+    cache.get("MATH1010U")
+    cache.get("MATH1010U")
+    assert calls == ["MATH1010U", "MATH1010U"]
+
+def test_least_recently_used_entry_is_evicted(clock):
+    fetch, calls = counting_fetch()
+    cache = ResultCache(fetch, max_size=2, clock=clock)
+
+    cache.get("A")
+    cache.get("B")
+    cache.get("A")  # B is now the least recently used
+    cache.get("C")
+    assert cache.peek("A") is not None
+    assert cache.peek("B") is None
+    assert cache.peek("C") is not None
+    assert cache.stats()["size"] == 2
+
+def test_failed_checks_are_not_cached(clock):
+    fetch, calls = counting_fetch({"A": CourseResult(course_code="A", error="timeout")})
+    cache = ResultCache(fetch, clock=clock)
+
+    assert not cache.get("A").ok
+    assert not cache.get("A").ok
+    assert calls == ["A", "A"]
+    cache.put(CourseResult(course_code="B", error="timeout"))
+    assert cache.peek("B") is None
+
+def test_concurrent_gets_share_one_check(clock):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    def fetch(course_code):
+        calls.append(course_code)
+        started.set()
+        release.wait(5)
+        return CourseResult(course_code=course_code, seats=3)
+
+    cache = ResultCache(fetch, clock=clock)
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get("A")))
+    owner.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get("A"))) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    while cache.stats()["coalesced"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [owner] + waiters:
+        thread.join(5)
+
+    assert calls == ["A"]
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+
+def test_concurrent_gets_share_the_error(clock):
+    started, release = threading.Event(), threading.Event()
+    def fetch(course_code):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("browser crashed")
+
+    cache = ResultCache(fetch, clock=clock)
+    errors = []
+    def get():
+        try:
+            cache.get("A")
+        except RuntimeError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=get)
+    owner.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=get)
+    waiter.start()
+    while cache.stats()["coalesced"] < 1:
+        threading.Event().wait(0.01)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(errors) == 2
+    assert cache.peek("A") is None and not cache.in_flight
+
+def test_fingerprint_stores_are_independent():
+    primary, shadow = FingerprintStore(), FingerprintStore()
+    result = CourseResult(course_code="A", seats=2)
+
+    primary.record("A", b"rows-1", result)
+    shadow.record("A", b"rows-2", CourseResult(course_code="A"))
+    assert primary.match("A", b"rows-1") is result
+    assert shadow.match("A", b"rows-1") is None
+    assert primary.stats() == {"courses": 1, "hits": 1, "misses": 0}
+
+def test_fingerprint_forget():
+    store = FingerprintStore()
+    store.record("FALL2025:A", b"x", CourseResult(course_code="A", term="FALL2025"))
+    store.record("B", b"y", CourseResult(course_code="B"))
+
+    store.forget("fall2025:a")
+    assert store.match("FALL2025:A", b"x") is None
+    assert store.match("B", b"y") is not None
+    store.forget()
+    assert store.stats()["courses"] == 0
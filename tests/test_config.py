@@ -0,0 +1,42 @@
+import pytest
+import config
+from config import load_watch_settings, parse_mapping
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """A .env file loaded at startup, with an empty process environment."""
+    path = tmp_path / ".env"
+    path.write_text("COURSE_CODES=A,B\nINTERVAL_MIN=5\nCYCLE_DEADLINE_SEC=100\nCOURSE_PRIORITIES=A=10\n")
+    monkeypatch.setattr(config, "DOTENV_FILE", str(path))
+    monkeypatch.setattr(config, "BASE_ENVIRON", {})
+    return path
+
+def test_separate_watch_file_keeps_dotenv_settings(env_file, tmp_path):
+    watch = tmp_path / "watch.env"
+    watch.write_text("COURSE_CODES=C\n")
+
+    settings = load_watch_settings(str(watch))
+    assert settings["course_codes"] == ["C"]
+    assert settings["course_priorities"] == {"A": 10}
+    assert settings["cycle_deadline_sec"] == 100
+
+def test_removed_key_falls_back_to_the_process_environment(env_file, monkeypatch):
+    monkeypatch.setattr(config, "BASE_ENVIRON", {"COURSE_PRIORITIES": "B=3"})
+    env_file.write_text("COURSE_CODES=A,B\nINTERVAL_MIN=2\n")
+
+    settings = load_watch_settings(str(env_file))
+    assert settings["course_priorities"] == {"B": 3}
+    assert settings["interval_min"] == 2
+    assert settings["cycle_deadline_sec"] == 120  # Defaults to the interval again
+
+def test_process_environment_wins_over_dotenv_but_not_the_watch_file(env_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "BASE_ENVIRON", {"INTERVAL_MIN": "7", "COURSE_CODES": "X"})
+    watch = tmp_path / "watch.env"
+    watch.write_text("COURSE_CODES=C\n")
+
+    settings = load_watch_settings(str(watch))
+    assert settings["interval_min"] == 7
+    assert settings["course_codes"] == ["C"]
+
+def test_parse_mapping_skips_malformed_items():
+    assert parse_mapping("A=1, B = 2,C=,=3,D", int) == {"A": 1, "B": 2}
@@ -0,0 +1,72 @@
+import io
+import json
+import pytest
+import scraper
+from main import build_parser, collect_course_codes, run_check, EXIT_AVAILABLE, EXIT_NONE_AVAILABLE, EXIT_ERROR
+from models import CourseResult, SectionResult
+from utils import split_watch_key
+
+def parse(*argv):
+    return build_parser().parse_args(["check", *argv])
+
+class FakeScraper:
+    """Returns a canned result per course code."""
+    results = {}
+    closed = 0
+
+    def __init__(self):
+        pass
+
+    def start_session(self):
+        return True
+
+    def check_course_result(self, course_code):
+        term, code = split_watch_key(course_code)
+        return self.results.get(course_code) or CourseResult(course_code=code, term=term)
+
+    def close(self):
+        FakeScraper.closed += 1
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    monkeypatch.setattr(scraper, "CourseScraper", FakeScraper)
+    FakeScraper.results, FakeScraper.closed = {}, 0
+    return FakeScraper
+
+def test_codes_from_arguments_file_and_stdin(tmp_path, monkeypatch):
+    codes_file = tmp_path / "courses.txt"
+    codes_file.write_text("csci 2000u, MATH1010U  # first year\n\n# comment\nCSCI2000U\n")
+    monkeypatch.setattr("sys.stdin", io.StringIO("FALL2025:CSCI2020U\n"))
+
+    args = parse("PHY1010U", "-", "--file", str(codes_file))
+    assert collect_course_codes(args) == ["PHY1010U", "CSCI2000U", "MATH1010U", "FALL2025:CSCI2020U"]
+
+def test_piped_stdin_is_read_when_nothing_else_is_given(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("CSCI2000U\n"))
+    assert collect_course_codes(parse()) == ["CSCI2000U"]
+
+def test_no_codes_is_an_error(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO(""))
+    assert run_check(parse()) == EXIT_ERROR
+
+def test_unreadable_file_is_an_error(tmp_path):
+    assert run_check(parse("--file", str(tmp_path / "missing.txt"))) == EXIT_ERROR
+
+def test_exit_code_when_a_course_is_open(fake_scraper, capsys):
+    section = SectionResult("CSCI", "2000U", "Lecture", "2 of 30 seats remain.", seats=2, crn="1")
+    fake_scraper.results = {"CSCI2000U": CourseResult(course_code="CSCI2000U", seats=2, sections=[section])}
+
+    assert run_check(parse("CSCI2000U", "MATH1010U", "--sections", "--delay", "0")) == EXIT_AVAILABLE
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(line["type"], line["course"]) for line in lines] == [
+        ("section", "CSCI2000U"), ("course", "CSCI2000U"), ("course", "MATH1010U"),
+    ]
+    assert lines[0]["crn"] == "1" and lines[1]["seats"] == 2
+    assert fake_scraper.closed == 1
+
+def test_exit_code_when_everything_is_full(fake_scraper):
+    assert run_check(parse("CSCI2000U", "--delay", "0")) == EXIT_NONE_AVAILABLE
+
+def test_failed_checks_exit_with_an_error(fake_scraper):
+    fake_scraper.results = {"CSCI2000U": CourseResult(course_code="CSCI2000U", error="timeout")}
+    assert run_check(parse("CSCI2000U", "MATH1010U", "--delay", "0")) == EXIT_ERROR
@@ -0,0 +1,70 @@
+import threading
+import pytest
+import notifier
+from notifier import NotificationBackend, NotificationService
+
+class RecordingBackend(NotificationBackend):
+    """Backend that records deliveries, optionally taking delay seconds each."""
+    name = "fast"
+    delay = 0.0
+
+    def __init__(self, rate_per_min=None, timeout=10):
+        super().__init__(rate_per_min, timeout)
+        self.sent = []
+        self.released = threading.Event()
+
+    def deliver(self, recipient, message, course_code, spots):
+        if self.delay:
+            self.released.wait(self.delay)
+        self.sent.append((recipient, message))
+        return "ok"
+
+class SlowBackend(RecordingBackend):
+    name = "slow"
+    delay = 5.0
+
+@pytest.fixture
+def service(monkeypatch):
+    """NotificationService with a fast and a slow backend for one subscriber."""
+    subscribers = [
+        {"name": "alice", "courses": [], "channels": [{"backend": "slow", "to": "1"}, {"backend": "fast", "to": "2"}]},
+        {"name": "bob", "courses": ["FALL2025:MATH1010U"], "channels": [{"backend": "fast", "to": "3"}]},
+    ]
+    monkeypatch.setattr(notifier, "load_subscribers", lambda: subscribers)
+    monkeypatch.setattr(notifier, "BACKENDS", {"slow": SlowBackend, "fast": RecordingBackend})
+    monkeypatch.setattr(notifier, "NOTIFY_TIMEOUT_SEC", 0.2)
+    service = NotificationService()
+    yield service
+    service.backends["slow"].released.set()
+    service.close()
+
+def test_slow_backend_does_not_hold_up_the_others(service):
+    # The slow deliveries are still running; the later ones must not queue behind them
+    for spots in (3, 2, 1):
+        assert service.notify("CSCI2000U", spots)
+    assert [message for _, message in service.backends["fast"].sent] == [
+        "CSCI2000U available now! 3 seats",
+        "CSCI2000U available now! 2 seats",
+        "CSCI2000U available now! 1 seats",
+    ]
+
+def test_duplicates_are_skipped_unless_a_message_is_given(service):
+    service.notify("CSCI2000U", 3)
+    service.notify("CSCI2000U", 3)
+    service.notify("CSCI2000U", 3, message="CSCI2000U open again! 3 seats")
+    assert len(service.backends["fast"].sent) == 2
+
+def test_subscriber_course_filter_matches_terms(service):
+    service.notify("FALL2025:MATH1010U", 1)
+    service.notify("WINTER2026:MATH1010U", 1)
+    assert [recipient for recipient, _ in service.backends["fast"].sent] == ["2", "3", "2"]
+
+def test_clearing_one_course_keeps_the_others(service):
+    service.notify("CSCI2000U", 3)
+    service.notify("FALL2025:MATH1010U", 1)
+    service.notify("CSCI2000U", 0, message="CSCI2000U is full again")
+
+    service.clear_notification_cache("csci2000u")
+    assert not service.has_notified("CSCI2000U")
+    assert service.has_notified("FALL2025:MATH1010U")
+    assert not service.has_notified("MATH1010U")
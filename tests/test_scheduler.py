@@ -0,0 +1,136 @@
+import pytest
+import scheduler
+from scheduler import CourseMonitor
+from cache import ResultCache
+from models import CourseResult
+from utils import RateLimiter, split_watch_key
+
+class FakeScraper:
+    """Answers fetch batches and records which courses each batch contained."""
+
+    def __init__(self):
+        self.batches = []
+        self.forgotten = []
+        self.active_term = None
+
+    def check_courses_fetch(self, course_codes):
+        self.batches.append(list(course_codes))
+        results = {}
+        for key in course_codes:
+            term, code = split_watch_key(key)
+            results[key] = CourseResult(course_code=code, term=term)
+        return results
+
+    def clear_fingerprints(self, course_code=None):
+        self.forgotten.append(course_code)
+
+    def breaker_stats(self):
+        return {}
+
+class FakeShadow:
+    def __init__(self):
+        self.verified = []
+
+    def maybe_verify(self, result, primary_seconds):
+        self.verified.append(result.key)
+
+class FakeBurst:
+    def __init__(self, active=()):
+        self.active = set(active)
+
+    def is_active(self, course_code):
+        return course_code in self.active
+
+    def observe(self, result):
+        return None
+
+@pytest.fixture
+def monitor(monkeypatch, clock):
+    """CourseMonitor without a browser, scheduler or signal handlers."""
+    for name in ("setup_components", "setup_scheduler", "setup_signal_handlers"):
+        monkeypatch.setattr(CourseMonitor, name, lambda self: None)
+    monitor = CourseMonitor()
+    monitor.scraper = FakeScraper()
+    monitor.cache = ResultCache(lambda key: CourseResult(course_code=key), clock=clock)
+    monitor.scrape_budget = RateLimiter(60, burst=10, clock=clock)
+    monitor.notifier = None
+    return monitor
+
+def test_every_course_in_a_fetch_batch_counts_as_fresh(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "SCRAPE_ENGINE", "fetch")
+    monitor.shadow = FakeShadow()
+    monitor.course_codes = ["A", "B", "C"]
+
+    monitor.check_all_courses()
+
+    assert monitor.scraper.batches == [["A", "B", "C"]]
+    assert monitor.shadow.verified == ["A", "B", "C"]
+    assert monitor.scrape_budget.tokens == 7
+
+def test_fetch_batch_leaves_out_courses_in_burst_mode(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "SCRAPE_ENGINE", "fetch")
+    monitor.burst = FakeBurst(active={"B"})
+    monitor.course_codes = ["A", "B", "C"]
+
+    monitor.check_all_courses()
+
+    assert monitor.scraper.batches == [["A", "C"]]
+
+def test_fetch_batch_fits_the_cycle_deadline(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "SCRAPE_ENGINE", "fetch")
+    monitor.course_codes = ["A", "B", "C", "D", "E"]
+    monitor.prefetch_avg_sec = 10
+    deadline = scheduler.time.monotonic() + 25
+
+    assert list(monitor.prefetch(monitor.course_codes, deadline)) == ["A", "B"]
+
+def test_courses_are_grouped_by_term_in_order_of_appearance(monitor):
+    monitor.course_codes = ["FALL2025:A", "B", "FALL2025:C", "WINTER2026:D", "E"]
+    assert monitor.plan_cycle() == ["FALL2025:A", "FALL2025:C", "B", "E", "WINTER2026:D"]
+
+def test_cycle_starts_with_the_term_the_browser_is_on(monitor):
+    monitor.course_codes = ["FALL2025:A", "B", "WINTER2026:D"]
+    monitor.scraper.active_term = "WINTER2026"
+    assert monitor.plan_cycle() == ["WINTER2026:D", "FALL2025:A", "B"]
+
+def test_shed_keeps_the_highest_priorities(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "OVERRUN_POLICY", "shed")
+    monitor.course_codes = ["A", "csci 2020u", "FALL2025:MATH1010U", "D"]
+    monitor.course_priorities = {"CSCI2020U": 10, "math1010u": 5}
+    monitor.avg_course_sec = 10
+    monitor.cycle_deadline_sec = 25
+
+    assert monitor.plan_cycle() == ["csci 2020u", "FALL2025:MATH1010U"]
+    assert monitor.cycle_stats["shed_courses"] == 2
+
+def test_exact_priority_wins_over_the_bare_code(monitor):
+    monitor.course_priorities = {"CSCI2020U": 1, "fall2025:csci2020u": 7}
+    assert monitor.priority_of("FALL2025:CSCI2020U") == 7
+    assert monitor.priority_of("WINTER2026:CSCI2020U") == 1
+    assert monitor.priority_of("MATH1010U") == 0
+
+def test_carried_courses_go_first(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "OVERRUN_POLICY", "carry")
+    monitor.course_codes = ["A", "B", "C", "D"]
+
+    monitor.handle_overrun(["C", "D"])
+    assert monitor.plan_cycle() == ["C", "D", "A", "B"]
+    assert monitor.plan_cycle() == ["A", "B", "C", "D"]
+    assert monitor.cycle_stats["overruns"] == 1 and monitor.cycle_stats["skipped_total"] == 2
+
+def test_skip_policy_drops_the_remaining_courses(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "OVERRUN_POLICY", "skip")
+    monitor.course_codes = ["A", "B", "C"]
+
+    monitor.handle_overrun(["C"])
+    assert monitor.plan_cycle() == ["A", "B", "C"]
+    assert monitor.cycle_stats["skipped_courses"] == 1
+
+def test_cycle_stops_at_the_deadline(monitor, monkeypatch):
+    monkeypatch.setattr(scheduler, "OVERRUN_POLICY", "carry")
+    monitor.course_codes = ["A", "B", "C"]
+    monitor.cycle_deadline_sec = 0
+
+    monitor.check_all_courses()
+    assert monitor.carried_courses == ["A", "B", "C"]
+    assert monitor.cycle_stats["overruns"] == 1
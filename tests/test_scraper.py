@@ -0,0 +1,228 @@
+import pytest
+import scraper
+from models import CourseResult
+from breaker import CircuitOpenError
+from scraper import CourseScraper, EngineState, StageError, fingerprint_rows, parse_seats
+
+def test_shadow_engine_state_has_its_own_breakers():
+    primary = EngineState(CourseScraper.STAGES)
+    shadow = EngineState(CourseScraper.STAGES, prefix="shadow fetch ")
+
+    primary.breakers["login"].record_failure()
+    primary.breakers["login"].record_failure()
+    assert not primary.breakers["login"].allow()
+    assert shadow.breakers["login"].allow()
+    assert shadow.breakers["login"].name == "shadow fetch login"
+
+def row(status, course_number="2000U", schedule_type="Lecture", crn="1"):
+    return {"subject": "CSCI", "courseNumber": course_number, "scheduleType": schedule_type,
+            "status": status, "courseReferenceNumber": crn, "sequenceNumber": "001"}
+
+@pytest.fixture
+def course_scraper(monkeypatch):
+    """CourseScraper without a browser."""
+    monkeypatch.setattr(CourseScraper, "setup_driver", lambda self: None)
+    return CourseScraper(profile_path=None)
+
+def pages(*pages):
+    """Yield rows page by page, like iter_result_rows."""
+    for page in pages:
+        yield from page
+
+def test_fingerprint_covers_only_parsed_cells():
+    a = row("2 of 30 seats remain.")
+    assert fingerprint_rows([a]) == fingerprint_rows([dict(a, instructor="Someone")])
+    assert fingerprint_rows([a]) != fingerprint_rows([row("1 of 30 seats remain.")])
+    assert fingerprint_rows([a, row("FULL", crn="2")]) != fingerprint_rows([row("FULL", crn="2"), a])
+
+def test_fingerprint_separates_cells_and_rows():
+    assert fingerprint_rows([{"subject": "AB", "courseNumber": ""}]) != fingerprint_rows([{"subject": "A", "courseNumber": "B"}])
+    assert fingerprint_rows([]) != fingerprint_rows([{}])
+
+def test_unchanged_rows_reuse_the_previous_result(course_scraper):
+    rows = [[row("FULL: 0 of 30 seats remain.", crn="1")], [row("3 of 30 seats remain.", crn="2"), row("x", "1010U")]]
+
+    first = course_scraper.parse_rows_if_changed(pages(*rows), "2000U", CourseResult(course_code="2000U"))
+    assert first.seats == 3 and len(first.sections) == 2 and not first.unchanged
+
+    second = course_scraper.parse_rows_if_changed(pages(*rows), "2000U", CourseResult(course_code="2000U"))
+    assert second.unchanged
+    assert second.seats == 3 and second.sections == first.sections
+
+    rows[1][0] = row("FULL: 0 of 30 seats remain.", crn="2")
+    third = course_scraper.parse_rows_if_changed(pages(*rows), "2000U", CourseResult(course_code="2000U"))
+    assert not third.unchanged and third.seats == 0
+    assert course_scraper.fingerprint_stats() == {"courses": 1, "hits": 1, "misses": 2}
+
+def test_fingerprints_are_kept_per_engine(course_scraper):
+    rows = [row("3 of 30 seats remain.")]
+    shadow = EngineState(CourseScraper.STAGES, prefix="shadow fetch ")
+
+    course_scraper.parse_rows_if_changed(rows, "2000U", CourseResult(course_code="2000U"))
+    result = course_scraper.parse_rows_if_changed(rows, "2000U", CourseResult(course_code="2000U"), shadow)
+    assert not result.unchanged
+    assert course_scraper.parse_rows_if_changed(rows, "2000U", CourseResult(course_code="2000U")).unchanged
+
+    course_scraper.clear_fingerprints("2000U")
+    assert not course_scraper.parse_rows_if_changed(rows, "2000U", CourseResult(course_code="2000U")).unchanged
+    assert shadow.fingerprints.stats()["courses"] == 1
+
+class ScriptDriver:
+    """Driver stand-in that records execute_script calls and returns a fixed value."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.value
+
+def test_term_label(course_scraper, monkeypatch):
+    monkeypatch.setattr(scraper, "DEFAULT_TERM", "winter")
+    assert course_scraper.term_label("FALL2025") == "fall 2025"
+    assert course_scraper.term_label("") == "winter"
+
+def test_page_shows_term_searches_in_the_page(course_scraper):
+    course_scraper.driver = ScriptDriver(True)
+    assert course_scraper.page_shows_term("Fall  2025")
+    assert course_scraper.driver.calls == [("fall 2025",)]
+
+class BrowserDriver:
+    """Driver stand-in with a cookie jar, a current URL and a quit counter."""
+
+    def __init__(self, url="https://ssb.example.edu/StudentRegistrationSsb/ssb/classSearch/classSearch"):
+        self.current_url = url
+        self.cookies = []
+        self.quits = 0
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Network.getAllCookies":
+            return {"cookies": list(self.cookies)}
+        self.cookies = params["cookies"]
+        return {}
+
+    def quit(self):
+        self.quits += 1
+
+@pytest.fixture
+def session_file(tmp_path, monkeypatch):
+    path = tmp_path / "session.json"
+    monkeypatch.setattr(scraper, "SESSION_FILE", str(path))
+    return path
+
+def test_session_round_trip_drops_expired_cookies(course_scraper, session_file):
+    course_scraper.driver = BrowserDriver()
+    course_scraper.driver.cookies = [
+        {"name": "JSESSIONID", "value": "a", "domain": "ssb.example.edu", "expires": -1},
+        {"name": "old", "value": "b", "domain": "sso.example.edu", "expires": 1},
+    ]
+    course_scraper.save_session()
+
+    restored = BrowserDriver()
+    course_scraper.driver = restored
+    assert course_scraper.restore_session()
+    assert [cookie["name"] for cookie in restored.cookies] == ["JSESSIONID"]
+
+def test_close_keeps_the_saved_session_when_logged_out(course_scraper, session_file):
+    session_file.write_text("good session")
+    driver = course_scraper.driver = BrowserDriver(url="https://sso.example.edu/login")
+
+    course_scraper.close()
+    course_scraper.close()
+    assert session_file.read_text() == "good session"
+    assert driver.quits == 1 and course_scraper.driver is None
+
+def test_close_saves_a_logged_in_session(course_scraper, session_file):
+    course_scraper.driver = BrowserDriver()
+    course_scraper.driver.cookies = [{"name": "JSESSIONID", "value": "a", "expires": -1}]
+
+    course_scraper.close()
+    assert "JSESSIONID" in session_file.read_text()
+
+def test_burst_scraper_never_saves_the_session(monkeypatch, session_file):
+    monkeypatch.setattr(CourseScraper, "setup_driver", lambda self: None)
+    burst_scraper = CourseScraper(profile_path=None, debug_port=0, persist_session=False)
+    burst_scraper.driver = BrowserDriver()
+
+    burst_scraper.close()
+    assert not session_file.exists()
+
+def test_run_stage_opens_the_breaker_after_failures(course_scraper, monkeypatch):
+    breaker = course_scraper.primary.breakers["search"]
+    breaker.failure_threshold = 2
+
+    assert course_scraper.run_stage("search", lambda code: code, "CSCI2000U") == "CSCI2000U"
+    with pytest.raises(StageError):
+        course_scraper.run_stage("search", lambda: False)
+    with pytest.raises(StageError):
+        course_scraper.run_stage("search", lambda: 1 / 0)
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        course_scraper.run_stage("search", lambda: calls.append(1) or True)
+    assert calls == []
+    assert course_scraper.breaker_stats()["search"]["state"] == "open"
+    assert course_scraper.breaker_stats()["login"]["state"] == "closed"
+
+@pytest.mark.parametrize("status, seats", [
+    ("2 of 30 seats remain.", 2),
+    ("FULL: 0 of 30 seats remain.", 0),
+    ("1 of 45 Seats Rem", 1),
+    ("5 of 40", 5),
+    ("Open", 1),
+    ("OPEN 7", 7),
+    ("Closed", 0),
+    ("", 0),
+])
+def test_parse_seats(status, seats):
+    assert parse_seats(status) == seats
+
+class PagedDriver:
+    """Results table split into pages, driven through the scripts iter_result_rows runs."""
+
+    def __init__(self, pages, largest=None):
+        self.pages = pages
+        self.page = 0
+        self.largest = largest
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        if script == scraper.MAX_PAGE_SIZE_SCRIPT:
+            self.scripts.append("page size")
+            return self.largest
+        if script == scraper.NEXT_PAGE_SCRIPT:
+            self.scripts.append("next")
+            if self.page + 1 >= len(self.pages):
+                return False
+            self.page += 1
+            return True
+        if script == scraper.EXTRACT_ROWS_SCRIPT:
+            return list(self.pages[self.page])
+        # first_result_row: something to watch for staleness, if there are rows
+        return ("row", self.page) if self.pages[self.page] else None
+
+def test_result_pages_are_read_in_order(course_scraper, monkeypatch):
+    waits = []
+    monkeypatch.setattr(course_scraper, "wait_for_page_change", waits.append)
+    course_scraper.driver = PagedDriver([[row("a", crn="1")], [row("b", crn="2")], [row("c", crn="3")]], largest=100)
+
+    rows = course_scraper.iter_result_rows()
+    assert next(rows)["courseReferenceNumber"] == "1"
+    assert course_scraper.driver.page == 0  # The next page isn't loaded until it's needed
+    assert [r["courseReferenceNumber"] for r in rows] == ["2", "3"]
+    assert waits == [("row", 0), ("row", 0), ("row", 1)]
+
+def test_empty_results_skip_the_page_size_switch(course_scraper, monkeypatch):
+    monkeypatch.setattr(course_scraper, "wait_for_page_change", lambda row: pytest.fail("waited on an empty table"))
+    course_scraper.driver = PagedDriver([[]], largest=100)
+
+    assert list(course_scraper.iter_result_rows()) == []
+    assert course_scraper.driver.scripts == []
+
+def test_pages_stop_at_the_limit(course_scraper, monkeypatch):
+    monkeypatch.setattr(scraper, "RESULTS_MAX_PAGES", 2)
+    monkeypatch.setattr(course_scraper, "wait_for_page_change", lambda row: None)
+    course_scraper.driver = PagedDriver([[row("a")], [row("b")], [row("c")]])
+
+    assert [r["status"] for r in course_scraper.iter_result_rows()] == ["a", "b"]
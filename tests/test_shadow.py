@@ -0,0 +1,53 @@
+from models import CourseResult, SectionResult
+from shadow import ShadowVerifier, compare_results, LatencyStats
+
+def result(seats, sections=(), **kwargs):
+    return CourseResult(course_code="CSCI2000U", seats=seats, sections=[
+        SectionResult("CSCI", "2000U", "Lecture", "Open", seats=section_seats, crn=crn)
+        for crn, section_seats in sections
+    ], **kwargs)
+
+def test_matching_results_agree():
+    assert compare_results(result(2, [("1", 2), ("2", 0)]), result(2, [("2", 0), ("1", 2)])) == []
+
+def test_seat_and_section_differences_are_listed():
+    differences = compare_results(result(2, [("1", 2), ("2", 0)]), result(3, [("1", 3)]))
+    assert differences == [
+        "seats: primary=2 shadow=3",
+        "section 1: primary=2 shadow=3",
+        "section 2: primary=0 shadow=None",
+    ]
+
+def test_errors_are_a_difference_only_on_one_side():
+    failed = result(0, error="timeout")
+    assert compare_results(result(1), failed) == ["error: primary=None shadow='timeout'"]
+    assert compare_results(failed, result(0, error="circuit open")) == []
+
+def test_sections_without_crn_compare_by_position():
+    primary = result(1, [("", 1)])
+    assert compare_results(primary, result(1, [("", 0)])) == ["section 0: primary=1 shadow=0"]
+
+def test_verifier_samples_and_records_stats():
+    samples = iter([0.05, 0.5, 0.01])
+    verifier = ShadowVerifier(lambda key: result(1), "fetch", sample_rate=0.1, sampler=lambda: next(samples))
+
+    assert verifier.maybe_verify(result(1), 2.0) == []
+    assert verifier.maybe_verify(result(1), 2.0) is None
+    assert verifier.maybe_verify(result(0), 2.0) == ["seats: primary=0 shadow=1"]
+    stats = verifier.stats()
+    assert (stats["samples"], stats["agreements"], stats["disagreements"]) == (2, 1, 1)
+
+def test_shadow_engine_exceptions_count_as_errors():
+    def broken(key):
+        raise RuntimeError("no session")
+
+    verifier = ShadowVerifier(broken, "fetch", sample_rate=1)
+    assert verifier.maybe_verify(result(1), 1.0) == ["error: primary=None shadow='no session'"]
+    assert verifier.stats()["shadow_errors"] == 1
+
+def test_latency_summary():
+    stats = LatencyStats()
+    assert stats.summary() == {"count": 0}
+    for seconds in range(1, 101):
+        stats.add(seconds / 100)
+    assert stats.summary() == {"count": 100, "mean": 0.505, "p50": 0.51, "p95": 0.96}
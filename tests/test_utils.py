@@ -0,0 +1,76 @@
+import json
+import logging
+import queue
+import sys
+from utils import JsonFormatter, RateLimiter, _QueueHandler, split_watch_key, watch_key
+
+def test_rate_limiter_allows_a_burst_then_refills(clock):
+    limiter = RateLimiter(6, burst=2, clock=clock)  # One token every 10s
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    clock.advance(9)
+    assert not limiter.try_acquire()
+    clock.advance(1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+def test_rate_limiter_refill_is_capped_at_burst(clock):
+    limiter = RateLimiter(60, burst=3, clock=clock)
+    for _ in range(3):
+        limiter.try_acquire()
+
+    clock.advance(3600)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+def test_rate_limiter_acquire_gives_up_before_the_timeout(clock):
+    limiter = RateLimiter(1, burst=1, clock=clock)  # One token per minute
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=30)
+
+def test_watch_keys_round_trip():
+    assert split_watch_key("fall2025:csci 2000u") == ("FALL2025", "CSCI2000U")
+    assert split_watch_key("CSCI2000U") == ("", "CSCI2000U")
+    assert watch_key("FALL2025", "CSCI2000U") == "FALL2025:CSCI2000U"
+    assert watch_key("", "CSCI2000U") == "CSCI2000U"
+
+def make_record(msg, *args, exc_info=None, **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    record = make_record("Course %s: %s seats", "CSCI2000U", 2, course="CSCI2000U", seats=2)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["msg"] == "Course CSCI2000U: 2 seats"
+    assert (entry["course"], entry["seats"]) == ("CSCI2000U", 2)
+    assert "args" not in entry and "exc" not in entry
+
+def test_json_formatter_includes_exceptions():
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        record = make_record("Parse failed", exc_info=sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: bad row" in entry["exc"]
+
+def test_queue_handler_merges_args_but_keeps_extra_fields():
+    rows = ["a"]
+    record = make_record("Rows: %s", rows, course="CSCI2000U")
+    prepared = _QueueHandler(queue.SimpleQueue()).prepare(record)
+    rows.append("b")  # Mutated after the call returned
+
+    assert prepared is not record and record.args == (rows,)
+    assert prepared.msg == "Rows: ['a']" and prepared.args is None
+    assert prepared.course == "CSCI2000U"
+
+def test_queue_handler_formats_exceptions_before_queueing():
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        record = make_record("Parse failed", exc_info=sys.exc_info())
+    prepared = _QueueHandler(queue.SimpleQueue()).prepare(record)
+    assert prepared.exc_info is None
+    assert "ValueError: bad row" in prepared.exc_text
@@ -1,20 +1,147 @@
 import logging
+import logging.handlers
+import atexit
+import queue
+import copy
+import json
 import sys
+import threading
+import time
 
-def setup_logging(log_level: str = "INFO", log_file: str = None) -> None:
-    """Set up logging configuration."""
-    log_format = "%(asctime)s - %(levelname)s - %(message)s"
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JsonFormatter(logging.Formatter):
+    """Format records as compact single-line JSON, including any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the handlers behind the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge args now (they may be mutated later) but keep the record structured
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging(log_level: str = "INFO", log_file: str = None, stream=None,
+                  log_format: str = "text", use_queue: bool = False) -> None:
+    """
+    Set up logging configuration. Console output goes to stdout unless another stream is given.
+    log_format "json" writes compact structured records; use_queue moves the actual
+    console/file writes onto a background thread so logging calls return immediately.
+    """
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     
-    handlers = [logging.StreamHandler(sys.stdout)]
+    handlers = [logging.StreamHandler(stream or sys.stdout)]
     if log_file:
         handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        # Flush whatever is still queued on exit
+        atexit.register(listener.stop)
+        handlers = [_QueueHandler(log_queue)]
     
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format=log_format,
         handlers=handlers
     )
 
+def read_course_codes(lines) -> list:
+    """
+    Parse course codes from an iterable of text lines.
+    Codes may be separated by commas or newlines; blank lines and '#' comments are ignored.
+    Duplicates are dropped while preserving order.
+    """
+    codes = []
+    seen = set()
+    for line in lines:
+        line = line.split("#", 1)[0]
+        for token in line.split(","):
+            code = sanitize_course_code(token)
+            if code and code not in seen:
+                seen.add(code)
+                codes.append(code)
+    return codes
+
 def sanitize_course_code(course_code: str) -> str:
     """Clean and format course code."""
-    return course_code.strip().upper().replace(" ", "") 
\ No newline at end of file
+    return course_code.strip().upper().replace(" ", "")
+
+def split_watch_key(key: str) -> tuple:
+    """
+    Split a watched course ("FALL:CSCI2000U" or "CSCI2000U") into (term, course code).
+    The term is "" for courses watched in the default term.
+    """
+    term, _, course_code = sanitize_course_code(key).rpartition(":")
+    return term, course_code
+
+def watch_key(term: str, course_code: str) -> str:
+    """Inverse of split_watch_key."""
+    return f"{term}:{course_code}" if term else course_code
+
+class RateLimiter:
+    """Token bucket allowing rate_per_min events per minute, with bursts of up to burst."""
+    
+    def __init__(self, rate_per_min: float, burst: int = None, clock=time.monotonic):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_min)))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+    
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        return self._take() == 0
+    
+    def acquire(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a token. Returns False if none became available."""
+        deadline = self.clock() + timeout
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return True
+            remaining = deadline - self.clock()
+            if remaining <= 0 or wait > remaining:
+                return False
+            time.sleep(wait)
+    
+    def _take(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            if self.rate <= 0:
+                return float("inf")
+            return (1 - self.tokens) / self.rate